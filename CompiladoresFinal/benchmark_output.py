@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Mide la salida del código generado con y sin --buffered en una escena
+con muchos decir que se repite varias veces:
+1. stdout a una tubería (como al redirigir la salida a un archivo)
+2. stdout a una pseudo-terminal (como en una consola, con búfer por línea)
+"""
+import argparse
+import os
+import pty
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from code_generator import PythonCodeGenerator
+from frontend import FastFrontend
+
+
+def print_heavy_program(lines):
+    """Una escena con muchos decir que vuelve a sí misma con cada opción"""
+    parts = ["escena relato {\n"]
+    for i in range(lines):
+        parts.append(f'    decir "Línea {i} del relato, con algo de texto para llenar la pantalla";\n')
+    parts.append('    opcion "Otra vez" ir_a relato;\n')
+    parts.append("}\n")
+    return "".join(parts)
+
+
+def generate(text, buffered):
+    frontend = FastFrontend()
+    ir = frontend.build_ir(frontend.parse_text(text))
+    return PythonCodeGenerator(buffered).generate(ir)
+
+
+def run_with_pipe(script, answers):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, script], input=answers, stdout=subprocess.PIPE,
+                   stderr=subprocess.DEVNULL, text=True)
+    return time.perf_counter() - start
+
+
+def run_with_pty(script, answers):
+    """Ejecuta con stdout en una pseudo-terminal y la vacía desde un hilo"""
+    master, slave = pty.openpty()
+    
+    def drain():
+        try:
+            while os.read(master, 65536):
+                pass
+        except OSError:
+            pass
+    
+    reader = threading.Thread(target=drain)
+    reader.start()
+    start = time.perf_counter()
+    subprocess.run([sys.executable, script], input=answers.encode("utf-8"), stdout=slave,
+                   stderr=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    os.close(slave)
+    reader.join()
+    os.close(master)
+    return elapsed
+
+
+def benchmark(lines=2000, rounds=50):
+    text = print_heavy_program(lines)
+    # Cada "s" repite la escena; al acabarse la entrada el programa termina
+    answers = "s\n" * (rounds - 1)
+    total_lines = lines * rounds
+    print(f"Escena de {lines} decir, {rounds} vueltas ({total_lines} líneas)")
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts = {}
+        for buffered in (False, True):
+            script = os.path.join(tmp, f"relato_{'buffered' if buffered else 'print'}.py")
+            with open(script, "w", encoding="utf-8") as f:
+                f.write(generate(text, buffered))
+            scripts[buffered] = script
+        
+        for label, runner in (("tubería", run_with_pipe), ("terminal", run_with_pty)):
+            plain = runner(scripts[False], answers)
+            buffered = runner(scripts[True], answers)
+            print(f"  {label}:")
+            print(f"    print:      {plain * 1000:9.1f} ms  {total_lines / plain:12,.0f} líneas/s")
+            print(f"    --buffered: {buffered * 1000:9.1f} ms  {total_lines / buffered:12,.0f} líneas/s")
+            print(f"    aceleración: {plain / buffered:.1f}x")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Mide la salida del código generado")
+    arg_parser.add_argument("lines", nargs="?", type=int, default=2000,
+                            help="decir en la escena (por defecto 2000)")
+    arg_parser.add_argument("--rounds", type=int, default=50,
+                            help="veces que se repite la escena (por defecto 50)")
+    args = arg_parser.parse_args()
+    benchmark(args.lines, args.rounds)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Mide el arranque en frío de main.py:
+1. Tiempo total de importación con python -X importtime en los casos que
+   no necesitan ANTLR (--help y un acierto del caché), comparado con un
+   presupuesto, y verifica que ANTLR no se cargue en ellos
+2. Tiempo de pared (el mejor de varios intentos) de --help, un acierto del
+   caché y una compilación sin caché con cada frontend
+Termina con código 1 si algún caso pasa el presupuesto o carga ANTLR.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Presupuesto de importación (ms) para los casos que no parsean. Medido
+# con -X importtime, que agrega algo de costo propio.
+STARTUP_BUDGET_MS = 120
+SAMPLE = "tests/test01_basico.txt"
+
+
+def import_profile(args):
+    """Retorna (ms totales de importación, módulos importados) de main.py"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args],
+                            capture_output=True, text=True)
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip())
+        # Solo los módulos de primer nivel: los anidados ya están sumados
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def wall_time(command, runs=7):
+    """Mejor tiempo (ms) de python <command>"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *command], capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark(budget_ms=STARTUP_BUDGET_MS, runs=7):
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "salida.py")
+        cache = ["--cache-dir", os.path.join(tmp, "cache")]
+        # Llena el caché para el caso del acierto
+        subprocess.run([sys.executable, "main.py", SAMPLE, output, *cache], capture_output=True)
+        
+        cases = [
+            ("--help", ["--help"]),
+            ("acierto del caché", [SAMPLE, output, *cache]),
+        ]
+        print(f"Importación (presupuesto {budget_ms} ms):")
+        for label, args in cases:
+            total_ms, modules = import_profile(args)
+            loads_antlr = "antlr4" in modules
+            status = "✓" if total_ms <= budget_ms and not loads_antlr else "✗"
+            ok = ok and status == "✓"
+            antlr_note = "  (¡carga ANTLR!)" if loads_antlr else ""
+            print(f"  {status} {label:<20} {total_ms:8.1f} ms{antlr_note}")
+        
+        print(f"\nTiempo de pared (mejor de {runs}):")
+        cases += [
+            ("sin caché, fast", [SAMPLE, output, "--no-cache", "--frontend", "fast"]),
+            ("sin caché, antlr", [SAMPLE, output, "--no-cache"]),
+        ]
+        for label, args in cases:
+            print(f"  {label:<22} {wall_time(['main.py', *args], runs):8.1f} ms")
+        print(f"  {'python -c pass':<22} {wall_time(['-c', 'pass'], runs):8.1f} ms")
+    return ok
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Mide el arranque de main.py")
+    arg_parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                            help=f"presupuesto de importación en ms (por defecto {STARTUP_BUDGET_MS})")
+    arg_parser.add_argument("--runs", type=int, default=7,
+                            help="intentos por caso para el tiempo de pared (por defecto 7)")
+    args = arg_parser.parse_args()
+    sys.exit(0 if benchmark(args.budget, args.runs) else 1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Suite de rendimiento del compilador sobre programas sintéticos
+(benchmarks.StoryGenerator) de distintas formas:
+1. Mide cada fase (léxico, sintáctico, semántico, IR y generación) con
+   cada frontend, el mejor de varios intentos, y su velocidad en KB/s
+   de fuente
+2. Con --save-baseline NOMBRE guarda los tiempos como referencia
+3. Con --compare NOMBRE los compara con una referencia guardada y
+   termina con código 1 si alguna fase es más lenta que el umbral
+Las referencias solo son comparables en la misma máquina y versión de
+Python.
+"""
+import argparse
+import dataclasses
+import sys
+
+from benchmarks import (StoryShape, baseline_path, compare, format_comparison, generate_story,
+                        load_baseline, save_baseline)
+from code_generator import PythonCodeGenerator
+from frontend import create_frontend
+from profiler.CompileProfiler import PHASE_LABELS, CompileProfiler, format_metric
+from optimizer.Optimizer import ir_size
+
+# Casos de la suite: cada uno estresa una parte distinta del compilador
+SUITE = {
+    # Muchas escenas cortas encadenadas, cada una con una opción a la siguiente
+    "lineal": StoryShape(scenes=2000, dialogues=4, branching=1),
+    # Muchas opciones por escena: más referencias que resolver
+    "ramificado": StoryShape(scenes=2000, dialogues=2, branching=6, cycle_density=0.1),
+    # Grafo con muchos ciclos
+    "ciclos": StoryShape(scenes=2000, dialogues=2, branching=3, cycle_density=0.8),
+    # Pocos tokens pero textos largos: pesa el lexer y la salida
+    "textos_largos": StoryShape(scenes=300, dialogues=8, branching=2, text_length=400),
+    # Pocas escenas con muchísimos diálogos
+    "escenas_grandes": StoryShape(scenes=20, dialogues=1500, branching=3),
+}
+
+PHASES = ("lex", "parse", "semantic", "ir", "codegen")
+
+
+def measure(frontend, text):
+    """Recorre las 5 fases una vez; retorna el CompileProfiler con los tiempos"""
+    profiler = CompileProfiler(memory=False)
+    with profiler.phase("lex"):
+        tokens = frontend.tokenize(text)
+    profiler.record(tokens=frontend.token_count(tokens))
+    with profiler.phase("parse"):
+        tree = frontend.parse_tokens(tokens)
+    profiler.record(nodes=frontend.node_count(tree))
+    with profiler.phase("semantic"):
+        errors = frontend.check(tree)
+    profiler.record(errors=len(errors))
+    with profiler.phase("ir"):
+        ir = frontend.build_ir(tree)
+    profiler.record(**dict(zip(("scenes", "instructions"), ir_size(ir))))
+    with profiler.phase("codegen"):
+        code = PythonCodeGenerator().generate(ir)
+    profiler.record(bytes=len(code.encode("utf-8")))
+    return profiler
+
+
+def throughput(kb, seconds):
+    """KB/s de fuente; '-' si la fase fue demasiado corta para medirla"""
+    return f"{kb / seconds:12,.0f} KB/s" if seconds >= 1e-5 else f"{'-':>12} KB/s"
+
+
+def run_case(frontend, text, runs):
+    """Mejor tiempo de cada fase en runs intentos, y las métricas de tamaño"""
+    best = {}
+    metrics = {}
+    for _ in range(runs):
+        for phase in measure(frontend, text).phases:
+            best[phase.name] = min(best.get(phase.name, float("inf")), phase.seconds)
+            metrics[phase.name] = phase.metrics
+    best["total"] = sum(best[phase] for phase in PHASES)
+    return best, metrics
+
+
+def run_suite(cases, frontends, runs=3, scale=1.0):
+    """Retorna {caso: {frontend: {fase: segundos}}} e imprime cada medición"""
+    results = {}
+    for case in cases:
+        shape = SUITE[case]
+        shape = dataclasses.replace(shape, scenes=max(1, int(shape.scenes * scale)))
+        text = generate_story(shape)
+        kb = len(text.encode("utf-8")) / 1024
+        print(f"\n{case}: {shape.scenes} escenas x {shape.dialogues} decir, "
+              f"{shape.branching} opciones, ciclos {shape.cycle_density:.0%}, {kb:.0f} KB")
+        results[case] = {}
+        for name in frontends:
+            seconds, metrics = run_case(create_frontend(name), text, runs)
+            results[case][name] = seconds
+            print(f"  {name}:")
+            for phase in PHASES:
+                size = ", ".join(format_metric(k, v) for k, v in metrics[phase].items())
+                print(f"    {PHASE_LABELS[phase]:<12}{seconds[phase] * 1000:10.2f} ms"
+                      f"{throughput(kb, seconds[phase])}  {size}")
+            print(f"    {'total':<12}{seconds['total'] * 1000:10.2f} ms{throughput(kb, seconds['total'])}")
+    return results
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Suite de rendimiento del compilador")
+    arg_parser.add_argument("cases", nargs="*", metavar="caso",
+                            help=f"casos a medir (por defecto todos: {', '.join(SUITE)})")
+    arg_parser.add_argument("--frontend", nargs="+", choices=["antlr", "fused", "fast"],
+                            default=["fast", "antlr"], help="frontends a medir (por defecto fast antlr)")
+    arg_parser.add_argument("--runs", type=int, default=3,
+                            help="intentos por caso; se toma el mejor (por defecto 3)")
+    arg_parser.add_argument("--scale", type=float, default=1.0,
+                            help="multiplica la cantidad de escenas de cada caso")
+    arg_parser.add_argument("--save-baseline", metavar="NOMBRE",
+                            help="guarda los tiempos en benchmarks/baselines/NOMBRE.json")
+    arg_parser.add_argument("--compare", metavar="NOMBRE",
+                            help="compara con una referencia guardada")
+    arg_parser.add_argument("--threshold", type=float, default=0.15,
+                            help="fracción más lenta que cuenta como regresión (por defecto 0.15)")
+    args = arg_parser.parse_args()
+    unknown = [case for case in args.cases if case not in SUITE]
+    if unknown:
+        arg_parser.error(f"casos desconocidos: {', '.join(unknown)} (hay: {', '.join(SUITE)})")
+    
+    results = run_suite(args.cases or list(SUITE), args.frontend, args.runs, args.scale)
+    if args.save_baseline:
+        path = baseline_path(args.save_baseline)
+        save_baseline(results, path)
+        print(f"\n✓ Referencia guardada: {path}")
+    if args.compare:
+        baseline = load_baseline(baseline_path(args.compare))
+        rows = compare(results, baseline, args.threshold)
+        print("\n" + format_comparison(rows, baseline))
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
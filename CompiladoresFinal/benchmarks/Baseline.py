@@ -0,0 +1,93 @@
+import json
+import os
+import platform
+from typing import Any, Dict, List
+from profiler.CompileProfiler import PHASE_LABELS
+
+# Versión del formato de los archivos de referencia
+BASELINE_FORMAT = 1
+
+# Fases más rápidas que esto en la referencia no se marcan como
+# regresión: con tiempos tan cortos el ruido pesa más que el cambio
+MIN_COMPARE_SECONDS = 0.002
+
+# Referencias locales: los tiempos dependen de la máquina, así que no se
+# versionan (ver .gitignore)
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def baseline_path(name: str) -> str:
+    """Un nombre sin extensión se guarda en benchmarks/baselines/"""
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(results: Dict[str, Any], path: str):
+    """
+    Guarda los tiempos de una corrida ({caso: {frontend: {fase: s}}})
+    junto con la versión de Python, que cambia los tiempos por sí sola.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = {
+        "format": BASELINE_FORMAT,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != BASELINE_FORMAT:
+        raise ValueError(f"'{path}' no es una referencia de benchmark_suite (formato {BASELINE_FORMAT})")
+    return data
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """
+    Compara fase por fase los casos y frontends que están en ambas
+    corridas. Cada fila tiene el cociente actual / referencia y si es una
+    regresión (más lenta que la referencia por más de threshold).
+    """
+    rows = []
+    reference = baseline["results"]
+    for case, frontends in results.items():
+        for frontend, phases in frontends.items():
+            old_phases = reference.get(case, {}).get(frontend)
+            if old_phases is None:
+                continue
+            for phase, seconds in phases.items():
+                old = old_phases.get(phase)
+                if not old:
+                    continue
+                ratio = seconds / old
+                rows.append({
+                    "case": case,
+                    "frontend": frontend,
+                    "phase": phase,
+                    "baseline": old,
+                    "current": seconds,
+                    "ratio": ratio,
+                    "regression": ratio > 1 + threshold and old >= MIN_COMPARE_SECONDS,
+                })
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]], baseline: Dict[str, Any]) -> str:
+    lines = [
+        f"Comparación con la referencia (Python {baseline.get('python')}, {baseline.get('machine')}):",
+        f"  {'Caso':<16}{'Frontend':<10}{'Fase':<12}{'Ref. (ms)':>11}{'Actual (ms)':>13}{'Cociente':>10}",
+    ]
+    for row in rows:
+        mark = "✗" if row["regression"] else " "
+        phase = PHASE_LABELS.get(row["phase"], row["phase"])
+        lines.append(f"{mark} {row['case']:<16}{row['frontend']:<10}{phase:<12}"
+                     f"{row['baseline'] * 1000:11.2f}{row['current'] * 1000:13.2f}{row['ratio']:9.2f}x")
+    regressions = sum(1 for row in rows if row["regression"])
+    lines.append(f"\n{regressions} regresiones en {len(rows)} mediciones")
+    return "\n".join(lines)
@@ -0,0 +1,72 @@
+import random
+from dataclasses import dataclass
+
+# Palabras para rellenar los textos; incluye acentos para que el lexer
+# y la salida trabajen con UTF-8 de verdad
+WORDS = ("el", "camino", "se", "divide", "en", "dos", "y", "una", "luz", "tenue",
+         "ilumina", "la", "puerta", "del", "castillo", "mientras", "canción",
+         "lejana", "acompaña", "al", "viajero", "cansado", "niño", "búho")
+
+
+@dataclass(frozen=True)
+class StoryShape:
+    """
+    Forma de un programa sintético:
+    - scenes: cantidad de escenas
+    - dialogues: decir por escena
+    - branching: opciones por escena
+    - cycle_density: probabilidad de que cada opción, salvo la primera,
+      vuelva a una escena anterior (0 = el grafo no tiene ciclos)
+    - text_length: caracteres aproximados de cada texto
+    - seed: semilla, para que el mismo StoryShape dé el mismo programa
+    """
+    scenes: int = 1000
+    dialogues: int = 4
+    branching: int = 2
+    cycle_density: float = 0.0
+    text_length: int = 40
+    seed: int = 0
+
+
+def filler_text(rng: random.Random, prefix: str, length: int) -> str:
+    words = [prefix]
+    size = len(prefix)
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def generate_story(shape: StoryShape) -> str:
+    """
+    Programa ScriptLang válido con la forma pedida. Con branching >= 1 la
+    primera opción de cada escena va a la siguiente, así que todas las
+    escenas son alcanzables; las demás que no forman ciclos saltan hacia
+    adelante, a una de las 10 escenas siguientes.
+    """
+    rng = random.Random(shape.seed)
+    last = shape.scenes - 1
+    parts = []
+    for i in range(shape.scenes):
+        parts.append(f"escena s{i} {{\n")
+        for j in range(shape.dialogues):
+            text = filler_text(rng, f"Escena {i}, línea {j}:", shape.text_length)
+            parts.append(f'    decir "{text}";\n')
+        options = 0
+        for k in range(shape.branching):
+            if k == 0 and i < last:
+                target = i + 1
+            elif rng.random() < shape.cycle_density:
+                target = rng.randint(0, i)
+            elif i < last:
+                target = rng.randint(i + 1, min(i + 10, last))
+            else:
+                continue
+            text = filler_text(rng, f"Opción {k}", min(shape.text_length, 30))
+            parts.append(f'    opcion "{text}" ir_a s{target};\n')
+            options += 1
+        if not shape.dialogues and not options:
+            parts.append('    decir "Fin";\n')
+        parts.append("}\n")
+    return "".join(parts)
@@ -0,0 +1,2 @@
+from .StoryGenerator import StoryShape, generate_story
+from .Baseline import baseline_path, compare, format_comparison, load_baseline, save_baseline
@@ -0,0 +1,102 @@
+import functools
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+# Subir esta versión invalida todo el caché aunque el código no cambie
+COMPILER_VERSION = "1.0"
+
+# Paquetes cuyo código fuente forma parte de la "versión" del compilador
+COMPILER_PACKAGES = ("frontend", "generated", "semantic_analyzer", "code_generator", "optimizer",
+                     "build_cache")
+
+# Módulos sueltos del camino de compilación: main.py une las fases y arma
+# la clave del caché
+COMPILER_MODULES = ("main.py", "lazy_exports.py")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_fingerprint() -> str:
+    """
+    Huella del compilador: COMPILER_VERSION más el contenido de sus
+    módulos. Cualquier cambio en el compilador invalida las entradas
+    generadas por la versión anterior.
+    """
+    digest = hashlib.sha256(COMPILER_VERSION.encode())
+    sources = [ROOT / module for module in COMPILER_MODULES]
+    for package in COMPILER_PACKAGES:
+        sources.extend(sorted((ROOT / package).glob("*.py")))
+    for source in sources:
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """
+    Caché en disco de compilaciones exitosas.
+
+    Cada entrada es el código Python generado, guardado como <clave>.out con
+    clave = sha256(huella del compilador + opciones + fuente). Cuando el caché
+    supera max_bytes, evict() borra las entradas usadas hace más tiempo.
+    """
+    def __init__(self, directory: str = ".scriptlang_cache", max_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def key(self, source: bytes, options: str = "") -> str:
+        digest = hashlib.sha256(compiler_fingerprint().encode())
+        digest.update(options.encode())
+        digest.update(b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.out"
+
+    def load(self, key: str) -> Optional[str]:
+        path = self.entry_path(key)
+        try:
+            code = path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        # Marca la entrada como usada recientemente para la expulsión
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return code
+
+    def store(self, key: str, code: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.entry_path(key)
+        # Escritura atómica: varios procesos pueden compartir el caché
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(code, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def evict(self):
+        """Borra las entradas menos usadas hasta quedar bajo max_bytes"""
+        if not self.directory.is_dir():
+            return
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.out"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
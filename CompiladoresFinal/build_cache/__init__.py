@@ -0,0 +1 @@
+from .BuildCache import BuildCache, COMPILER_VERSION, compiler_fingerprint
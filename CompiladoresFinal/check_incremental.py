@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Verifica el compilador incremental de --watch contra compilaciones
+completas con el frontend rápido. Parte de programas sintéticos y les
+aplica ediciones al azar (agregar, borrar o renombrar escenas, insertar
+opciones, o cortar y pegar texto suelto que suele romper la sintaxis);
+tras cada una, IncrementalCompiler.update() debe dar el mismo resultado
+que compilar el archivo completo:
+- los mismos errores de sintaxis, o
+- los mismos errores semánticos (con sus posiciones), o
+- el mismo código Python generado.
+Con la misma semilla se repiten las mismas ediciones.
+"""
+import argparse
+import random
+import re
+import sys
+
+from benchmarks import StoryShape, generate_story
+from code_generator import DispatchCodeGenerator, PythonCodeGenerator
+from frontend import FastFrontend
+from incremental import IncrementalCompiler
+
+# Fragmentos que se insertan en cualquier posición ("%d" es un número de escena)
+SNIPPETS = ('escena nueva%d {\n    decir "hola";\n}\n', " ", "\n", "x", ";", "}", "{", '"',
+            "/*", "*/", "// comentario\n", 'opcion "ir" ir_a s%d;\n', 'decir "t";\n',
+            "escena ", "s%d", 'escena s%d {\n  decir "dup";\n}\n')
+
+# Escenas que pueden aparecer en las ediciones (s0 a s40): muchas ya
+# existen, así que también se generan duplicadas y referencias rotas
+MAX_SCENE = 40
+
+
+def full_compile(frontend, text, dispatch):
+    """("syntax", errores), ("semantic", errores) u ("ok", código) compilando todo el archivo"""
+    program = frontend.parse_text(text)
+    syntax_errors = frontend.syntax_errors(program)
+    if syntax_errors:
+        return "syntax", syntax_errors
+    errors = frontend.check(program)
+    if errors:
+        return "semantic", errors
+    generator = DispatchCodeGenerator() if dispatch else PythonCodeGenerator()
+    return "ok", generator.generate(frontend.build_ir(program))
+
+
+def incremental_compile(compiler, text):
+    """Lo mismo que full_compile, con IncrementalCompiler.update()"""
+    result = compiler.update(text)
+    if result.syntax_errors:
+        return "syntax", result.syntax_errors
+    if result.errors:
+        return "semantic", result.errors
+    return "ok", compiler.output()
+
+
+def random_story(rng, seed):
+    text = generate_story(StoryShape(scenes=rng.randint(1, 30), dialogues=rng.randint(0, 3),
+                                     branching=rng.randint(1, 3), cycle_density=0.3, seed=seed))
+    if seed % 3 == 0:
+        # Varias escenas e instrucciones en la misma línea
+        text = text.replace("}\nescena", "} escena").replace(";\n    opcion", "; opcion")
+    return text
+
+
+def random_edit(rng, text):
+    """text con una edición al azar"""
+    scene = rng.randint(0, MAX_SCENE)
+    if rng.random() < 0.7:
+        # Ediciones que en general dejan el programa válido
+        opens = [m.end() for m in re.finditer(r"\{\n", text)]
+        heads = [m.start() for m in re.finditer(r"escena ", text)]
+        choice = rng.random()
+        if choice < 0.35 and opens:
+            pos = rng.choice(opens)
+            line = rng.choice([f'    opcion "ir" ir_a s{scene};\n', '    decir "t";\n'])
+            return text[:pos] + line + text[pos:]
+        if choice < 0.6 and heads:
+            pos = rng.choice(heads)
+            return text[:pos] + f'escena s{scene} {{\n  decir "x";\n}}\n' + text[pos:]
+        if choice < 0.8 and len(heads) > 1:
+            i = rng.randrange(len(heads))
+            end = heads[i + 1] if i + 1 < len(heads) else len(text)
+            return text[:heads[i]] + text[end:]
+        names = [m.span(1) for m in re.finditer(r"escena (\w+)", text)]
+        if names:
+            pos, end = rng.choice(names)
+            return text[:pos] + f"s{scene}" + text[end:]
+        return text
+    pos = rng.randint(0, len(text))
+    choice = rng.random()
+    if choice < 0.4:
+        snippet = rng.choice(SNIPPETS)
+        if "%d" in snippet:
+            snippet = snippet % scene
+        return text[:pos] + snippet + text[pos:]
+    if choice < 0.8:
+        return text[:pos] + text[pos + rng.randint(1, 30):]
+    # Reemplazar todo el archivo (recompilación completa)
+    return random_story(rng, rng.randint(0, 99))
+
+
+def check_random_edits(seed=0, trials=60, steps=40):
+    """Retorna la cantidad de ediciones en las que los resultados difieren"""
+    rng = random.Random(seed)
+    frontend = FastFrontend()
+    mismatches = 0
+    counts = {}
+    for trial in range(trials):
+        dispatch = trial % 2 == 1
+        compiler = IncrementalCompiler(dispatch=dispatch)
+        text = random_story(rng, trial)
+        last_valid = text
+        for step in range(steps):
+            expected = full_compile(frontend, text, dispatch)
+            got = incremental_compile(compiler, text)
+            counts[expected[0]] = counts.get(expected[0], 0) + 1
+            if got != expected:
+                mismatches += 1
+                print(f"✗ prueba {trial}, edición {step}: se esperaba {expected[0]} "
+                      f"y el incremental dio {got[0]}")
+                print(f"  esperado:    {str(expected[1])[:200]!r}")
+                print(f"  incremental: {str(got[1])[:200]!r}")
+                break  # El resto de la secuencia depende de este estado
+            if expected[0] != "syntax":
+                last_valid = text
+            elif rng.random() < 0.5:
+                # Deshacer, como quien corrige el error y vuelve a guardar
+                text = last_valid
+            text = random_edit(rng, text)
+    total = sum(counts.values())
+    summary = ", ".join(f"{kind}: {count}" for kind, count in sorted(counts.items()))
+    print(f"{total} ediciones en {trials} secuencias ({summary})")
+    return mismatches
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Compara el compilador incremental (--watch) con compilaciones completas")
+    arg_parser.add_argument("--seed", type=int, default=0, help="semilla (por defecto 0)")
+    arg_parser.add_argument("--trials", type=int, default=60,
+                            help="secuencias de ediciones (por defecto 60)")
+    arg_parser.add_argument("--steps", type=int, default=40,
+                            help="ediciones por secuencia (por defecto 40)")
+    args = arg_parser.parse_args()
+    mismatches = check_random_edits(args.seed, args.trials, args.steps)
+    print("✓ Mismos resultados" if not mismatches else f"✗ {mismatches} diferencias")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,154 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import Sequence
+from .CompactIR import CompactIR
+
+# Formato de archivo .slir (todas las secciones alineadas a 8 bytes):
+#
+#   cabecera   HEADER (ver abajo)
+#   scene_start      u32 * (escenas + 1)
+#   name_offsets     u32 * (escenas + 1)   offsets en bytes dentro de names
+#   ops              u8  * instrucciones
+#   texts            u32 * instrucciones
+#   targets          i32 * instrucciones
+#   string_offsets   u32 * (strings + 1)   offsets en bytes dentro de pool
+#   pool             textos en UTF-8, concatenados
+#   names            nombres de escena en UTF-8, concatenados
+#
+# La cabecera guarda el offset y el largo en bytes de cada sección, así que
+# un lector puede mapear solo lo que necesita.
+MAGIC = b"SLIR"
+FORMAT_VERSION = 1
+SECTIONS = ("scene_start", "name_offsets", "ops", "texts", "targets",
+            "string_offsets", "pool", "names")
+SECTION_TYPES = {"scene_start": "I", "name_offsets": "I", "ops": "B", "texts": "I",
+                 "targets": "i", "string_offsets": "I"}
+# magic, versión, orden de bytes (0 little, 1 big), escenas, instrucciones,
+# strings, primera escena y (offset, largo) por sección
+HEADER = struct.Struct("<4sHHIIIi" + "QQ" * len(SECTIONS))
+LITTLE, BIG = 0, 1
+NATIVE_ORDER = LITTLE if sys.byteorder == "little" else BIG
+
+
+class IRFormatError(Exception):
+    pass
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _utf8_table(strings):
+    """Concatena los textos en UTF-8 y retorna (bytes, offsets en bytes)"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    total = 0
+    for data in encoded:
+        total += len(data)
+        offsets.append(total)
+    return b"".join(encoded), offsets
+
+
+def write_ir(compact: CompactIR, path: str):
+    """Guarda una CompactIR en formato .slir"""
+    strings = [compact.string(i) for i in range(len(compact.string_offsets) - 1)]
+    pool, string_offsets = _utf8_table(strings)
+    names, name_offsets = _utf8_table(compact.scene_names)
+    payloads = {
+        "scene_start": compact.scene_start.tobytes(),
+        "name_offsets": name_offsets.tobytes(),
+        "ops": compact.ops.tobytes(),
+        "texts": compact.texts.tobytes(),
+        "targets": compact.targets.tobytes(),
+        "string_offsets": string_offsets.tobytes(),
+        "pool": pool,
+        "names": names,
+    }
+    layout = []
+    offset = _align(HEADER.size)
+    for section in SECTIONS:
+        layout.extend((offset, len(payloads[section])))
+        offset = _align(offset + len(payloads[section]))
+    
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, NATIVE_ORDER, compact.scene_count,
+                         compact.instruction_count, len(strings), compact.first_scene,
+                         *layout)
+    with open(path, "wb") as f:
+        f.write(header)
+        for section, section_offset in zip(SECTIONS, layout[::2]):
+            f.write(b"\0" * (section_offset - f.tell()))
+            f.write(payloads[section])
+
+
+class _NameTable(Sequence):
+    """Nombres de escena decodificados solo cuando se piden"""
+    def __init__(self, names, offsets):
+        self.names = names
+        self.offsets = offsets
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return str(self.names[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+
+class MappedIR(CompactIR):
+    """
+    CompactIR respaldada por un archivo .slir mapeado en memoria. Los
+    arreglos son vistas del mmap (sin copiar) y cada texto se decodifica
+    desde el pool solo cuando se usa, así que cargar es O(1) sin importar
+    el tamaño de la historia.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Archivo vacío
+                raise IRFormatError(f"'{path}' no es un archivo .slir")
+        view = memoryview(self._mmap)
+        if len(view) < HEADER.size:
+            raise IRFormatError(f"'{path}' no es un archivo .slir")
+        fields = HEADER.unpack_from(view)
+        magic, version, byte_order, _, _, _, first_scene = fields[:7]
+        if magic != MAGIC:
+            raise IRFormatError(f"'{path}' no es un archivo .slir")
+        if version != FORMAT_VERSION:
+            raise IRFormatError(f"'{path}' usa la versión {version} del formato "
+                                f"(se esperaba {FORMAT_VERSION})")
+        sections = {}
+        layout = fields[7:]
+        for i, section in enumerate(SECTIONS):
+            offset, length = layout[2 * i], layout[2 * i + 1]
+            if offset + length > len(view):
+                raise IRFormatError(f"'{path}' está truncado")
+            data = view[offset:offset + length]
+            typecode = SECTION_TYPES.get(section)
+            if typecode is not None:
+                if byte_order == NATIVE_ORDER:
+                    data = data.cast(typecode)
+                else:
+                    # Archivo de otra arquitectura: se copia y se invierte
+                    swapped = array(typecode)
+                    swapped.frombytes(data)
+                    swapped.byteswap()
+                    data = swapped
+            sections[section] = data
+        super().__init__(_NameTable(sections["names"], sections["name_offsets"]),
+                         sections["scene_start"], sections["ops"], sections["texts"],
+                         sections["targets"], sections["pool"], sections["string_offsets"],
+                         first_scene)
+    
+    def string(self, string_id: int) -> str:
+        offsets = self.string_offsets
+        return str(self.pool[offsets[string_id]:offsets[string_id + 1]], "utf-8")
+
+
+def load_ir(path: str) -> MappedIR:
+    return MappedIR(path)
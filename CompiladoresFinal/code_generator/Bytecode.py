@@ -0,0 +1,72 @@
+import importlib.util
+import marshal
+import os
+import struct
+from typing import Iterable
+
+# Cabecera de un .pyc (PEP 552): número mágico de esta versión de Python,
+# banderas y 8 bytes que dependen de las banderas. Se usa el modo por hash
+# sin verificación (banderas = 1): el .pyc no necesita el .py al lado y
+# CPython lo carga sin volver a leer ni compilar la fuente.
+PYC_UNCHECKED_HASH = 0b01
+PYC_HEADER = struct.Struct("<4sI8s")
+
+# Programa de arranque del zipapp: ejecuta la historia pedida directamente
+# desde el bytecode guardado en el zip
+BUNDLE_MAIN = '''\
+import marshal
+import pkgutil
+import sys
+
+def main():
+    nombres = sorted(pkgutil.get_data(__name__, "historias.txt").decode("utf-8").split())
+    if len(sys.argv) < 2 or sys.argv[1] not in nombres:
+        print("Uso: python " + sys.argv[0] + " <historia>")
+        print("Historias: " + ", ".join(nombres))
+        sys.exit(1)
+    data = pkgutil.get_data(__name__, "historias/" + sys.argv[1] + ".pyc")
+    codigo = marshal.loads(memoryview(data)[16:])
+    sys.argv = sys.argv[1:]
+    exec(codigo, {"__name__": "__main__"})
+
+main()
+'''
+
+
+def compile_python(python_code: str, filename: str = "<guion>"):
+    """Compila el código generado a un objeto código de CPython"""
+    return compile(python_code, filename, "exec", dont_inherit=True, optimize=2)
+
+
+def pyc_bytes(python_code: str, filename: str = "<guion>") -> bytes:
+    source = python_code.encode("utf-8")
+    header = PYC_HEADER.pack(importlib.util.MAGIC_NUMBER, PYC_UNCHECKED_HASH,
+                             importlib.util.source_hash(source))
+    return header + marshal.dumps(compile_python(python_code, filename))
+
+
+def write_pyc(python_code: str, path: str, filename: str = "<guion>"):
+    """
+    Guarda el código generado ya compilado. El .pyc solo sirve para la
+    misma versión de Python que lo creó; se ejecuta con python archivo.pyc.
+    """
+    with open(path, "wb") as f:
+        f.write(pyc_bytes(python_code, filename))
+
+
+def write_bundle(pyc_files: Iterable[str], path: str):
+    """
+    Empaqueta varios .pyc en un zipapp: python historias.pyz <nombre>
+    ejecuta la historia <nombre> sin compilar nada al arrancar.
+    """
+    import zipfile  # Solo para --bundle; cargarlo cuesta varios ms
+    
+    names = []
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("__main__.py", BUNDLE_MAIN)
+        for pyc_file in pyc_files:
+            name = os.path.splitext(os.path.basename(pyc_file))[0]
+            bundle.write(pyc_file, f"historias/{name}.pyc")
+            names.append(name)
+        bundle.writestr("historias.txt", "\n".join(names) + "\n")
+    return names
@@ -0,0 +1,153 @@
+from array import array
+from enum import IntEnum
+from functools import cached_property
+from typing import Dict, List, Any
+from .IRInstruction import IRInstruction
+
+class Opcode(IntEnum):
+    PRINT = 0
+    OPTION = 1
+
+
+# Destino de las instrucciones que no saltan (PRINT)
+NO_TARGET = -1
+
+
+class CompactIR:
+    """
+    IR compacta en forma de estructura de arreglos.
+    
+    Las escenas se identifican por un entero (su posición en scene_names)
+    y las instrucciones de la escena i ocupan las posiciones
+    scene_start[i] a scene_start[i + 1] - 1 de tres arreglos paralelos:
+    ops (Opcode), texts (id en la tabla de strings) y targets (id de la
+    escena destino o NO_TARGET). Todos los textos, sin repetir, están
+    concatenados en un único string pool; el texto k es
+    pool[string_offsets[k]:string_offsets[k + 1]]. Cada instrucción
+    ocupa 9 bytes en los arreglos en lugar de un objeto IRInstruction
+    más su string.
+    """
+    def __init__(self, scene_names: List[str], scene_start: array, ops: array,
+                 texts: array, targets: array, pool: str, string_offsets: array,
+                 first_scene: int = NO_TARGET):
+        self.scene_names = scene_names
+        self.scene_start = scene_start
+        self.ops = ops
+        self.texts = texts
+        self.targets = targets
+        self.pool = pool
+        self.string_offsets = string_offsets
+        self.first_scene = first_scene
+    
+    @classmethod
+    def from_ir(cls, ir: Dict[str, Any]) -> "CompactIR":
+        builder = CompactIRBuilder()
+        scenes = ir.get("scenes", {})
+        for scene_name in scenes:
+            builder.scene_id(scene_name)
+        for instructions in scenes.values():
+            for inst in instructions:
+                if inst.op == "PRINT":
+                    builder.add_instruction(Opcode.PRINT, inst.arg1)
+                elif inst.op == "OPTION":
+                    if inst.arg2 not in scenes:
+                        raise ValueError(f"Escena '{inst.arg2}' no existe")
+                    builder.add_instruction(Opcode.OPTION, inst.arg1, builder.scene_id(inst.arg2))
+            builder.end_scene()
+        first_scene = ir.get("first_scene")
+        if first_scene is not None:
+            builder.first_scene = builder.scene_id(first_scene)
+        return builder.build()
+    
+    @cached_property
+    def scene_ids(self) -> Dict[str, int]:
+        return {name: i for i, name in enumerate(self.scene_names)}
+    
+    @property
+    def scene_count(self) -> int:
+        return len(self.scene_start) - 1
+    
+    @property
+    def instruction_count(self) -> int:
+        return len(self.ops)
+    
+    def string(self, string_id: int) -> str:
+        offsets = self.string_offsets
+        return self.pool[offsets[string_id]:offsets[string_id + 1]]
+    
+    def scene_range(self, scene_id: int) -> range:
+        return range(self.scene_start[scene_id], self.scene_start[scene_id + 1])
+    
+    def instructions(self, scene_id: int):
+        """Genera (opcode, texto, id destino) para cada instrucción de la escena"""
+        ops, texts, targets, string = self.ops, self.texts, self.targets, self.string
+        for i in self.scene_range(scene_id):
+            yield Opcode(ops[i]), string(texts[i]), targets[i]
+    
+    def to_ir(self) -> Dict[str, Any]:
+        """Reconstruye la IR de diccionario que usan los generadores de código"""
+        scenes: Dict[str, List[IRInstruction]] = {}
+        for scene_id, scene_name in enumerate(self.scene_names):
+            instructions = []
+            for op, text, target in self.instructions(scene_id):
+                if op == Opcode.PRINT:
+                    instructions.append(IRInstruction("PRINT", text))
+                else:
+                    instructions.append(IRInstruction("OPTION", text, self.scene_names[target]))
+            scenes[scene_name] = instructions
+        first_scene = self.scene_names[self.first_scene] if self.first_scene != NO_TARGET else None
+        return {"scenes": scenes, "first_scene": first_scene}
+
+
+class CompactIRBuilder:
+    """
+    Construye una CompactIR escena por escena. Las escenas reciben su id
+    la primera vez que se nombran, así que una instrucción puede saltar a
+    una escena que todavía no se agregó. Las tablas de búsqueda solo
+    existen mientras se construye.
+    """
+    def __init__(self):
+        self.scene_names: List[str] = []
+        self.scene_ids: Dict[str, int] = {}
+        self.scene_start = array('I', [0])
+        self.ops = array('B')
+        self.texts = array('I')
+        self.targets = array('i')
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        self.first_scene = NO_TARGET
+    
+    def scene_id(self, scene_name: str) -> int:
+        scene_id = self.scene_ids.get(scene_name)
+        if scene_id is None:
+            scene_id = len(self.scene_names)
+            self.scene_ids[scene_name] = scene_id
+            self.scene_names.append(scene_name)
+        return scene_id
+    
+    def intern(self, text: str) -> int:
+        string_id = self.string_ids.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.string_ids[text] = string_id
+            self.strings.append(text)
+        return string_id
+    
+    def add_instruction(self, op: Opcode, text: str, target: int = NO_TARGET):
+        self.ops.append(op)
+        self.texts.append(self.intern(text))
+        self.targets.append(target)
+    
+    def end_scene(self):
+        """Cierra la escena actual; las instrucciones siguientes son de la próxima"""
+        self.scene_start.append(len(self.ops))
+    
+    def build(self) -> CompactIR:
+        string_offsets = array('I', [0])
+        total = 0
+        for text in self.strings:
+            total += len(text)
+            string_offsets.append(total)
+        return CompactIR(self.scene_names, self.scene_start, self.ops, self.texts,
+                         self.targets, "".join(self.strings), string_offsets,
+                         self.first_scene)
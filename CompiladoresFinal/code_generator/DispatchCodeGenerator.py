@@ -0,0 +1,60 @@
+from typing import Dict, Any
+from .IRInstruction import IRInstruction
+from .PythonCodeGenerator import PythonCodeGenerator
+
+class DispatchCodeGenerator(PythonCodeGenerator):
+    """
+    Genera un despachador (trampolín) en lugar de llamadas anidadas.
+    
+    Cada escena se convierte en una función que retorna el id de la
+    siguiente escena (o None para terminar) y un único bucle la busca en
+    la tabla ESCENAS. La pila no crece aunque la historia tenga ciclos
+    como menu -> menu. A diferencia del modo por llamadas, ir_a es un
+    salto: al elegir una opción la escena actual no continúa.
+    """
+    def __init__(self, buffered: bool = False):
+        super().__init__(buffered)
+        self.scene_ids: Dict[str, int] = {}
+    
+    def generate(self, ir: Dict[str, Any]) -> str:
+        self.scene_ids = {name: i for i, name in enumerate(ir.get("scenes", {}))}
+        return super().generate(ir)
+    
+    def scene_id(self, scene_name: str) -> int:
+        # Las escenas aún no vistas reciben el siguiente id libre; así el
+        # modo por streaming puede emitir saltos a escenas posteriores
+        if scene_name not in self.scene_ids:
+            self.scene_ids[scene_name] = len(self.scene_ids)
+        return self.scene_ids[scene_name]
+    
+    def generate_header(self):
+        return ["# Guión interactivo generado (despachador)", ""] + self.generate_prologue()
+    
+    def generate_footer(self, first_scene):
+        # La tabla sigue el orden de los ids
+        lines = [
+            f"ESCENAS = [{', '.join(self.scene_ids)}]",
+            "",
+            "def ejecutar(escena):",
+            "    while escena is not None:",
+            "        escena = ESCENAS[escena]()",
+            "",
+        ]
+        if first_scene:
+            lines.append(f"if __name__ == '__main__':")
+            lines.append(f"    ejecutar({self.scene_id(first_scene)})")
+        return lines
+    
+    def generate_instruction(self, inst: IRInstruction):
+        if inst.op == "OPTION":
+            return [
+                f'opcion = input("{inst.arg1} -> ")',
+                f'if opcion.strip():',
+                f'    return {self.scene_id(inst.arg2)}  # {inst.arg2}'
+            ]
+        return super().generate_instruction(inst)
+    
+    def generate_branch_end(self):
+        # Elegir la opción era un salto: al terminar la escena incrustada
+        # termina la historia, como cuando su función retornaba None
+        return ["return None"]
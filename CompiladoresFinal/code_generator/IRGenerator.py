@@ -1,12 +1,7 @@
 from typing import List, Dict, Any
 from generated.ScriptLangVisitor import ScriptLangVisitor
 from generated.ScriptLangParser import ScriptLangParser
-
-class IRInstruction:
-    def __init__(self, op: str, arg1=None, arg2=None):
-        self.op = op
-        self.arg1 = arg1
-        self.arg2 = arg2
+from .IRInstruction import IRInstruction
 
 class IRGenerator(ScriptLangVisitor):
     def __init__(self):
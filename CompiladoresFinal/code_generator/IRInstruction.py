@@ -0,0 +1,7 @@
+class IRInstruction:
+    __slots__ = ("op", "arg1", "arg2")
+    
+    def __init__(self, op: str, arg1=None, arg2=None):
+        self.op = op
+        self.arg1 = arg1
+        self.arg2 = arg2
@@ -1,9 +1,16 @@
 from typing import Dict, List, Any
-from .IRGenerator import IRInstruction
+from .IRInstruction import IRInstruction
 
 class PythonCodeGenerator:
-    def __init__(self):
+    """
+    Con buffered=True los PRINT seguidos (hasta la próxima opción) se
+    escriben con un solo sys.stdout.write y el programa generado deja
+    stdout con búfer completo: input() lo vacía antes de cada pregunta,
+    así que en una terminal hay una escritura por opción y no por línea.
+    """
+    def __init__(self, buffered: bool = False):
         self.indent_level = 0
+        self.buffered = buffered
     
     def indent(self):
         self.indent_level += 1
@@ -16,7 +23,7 @@ class PythonCodeGenerator:
         return "    " * self.indent_level
     
     def generate(self, ir: Dict[str, Any]) -> str:
-        lines = ["# Guión interactivo generado", ""]
+        lines = self.generate_header()
         scenes = ir.get("scenes", {})
         first_scene = ir.get("first_scene")
         
@@ -24,12 +31,32 @@ class PythonCodeGenerator:
             lines.extend(self.generate_scene(scene_name, instructions))
             lines.append("")
         
-        if first_scene:
-            lines.append(f"if __name__ == '__main__':")
-            lines.append(f"    {first_scene}()")
-        
+        lines.extend(self.generate_footer(first_scene))
         return "\n".join(lines)
     
+    def generate_header(self):
+        return ["# Guión interactivo generado", ""] + self.generate_prologue()
+    
+    def generate_prologue(self):
+        if not self.buffered:
+            return []
+        return [
+            "import sys",
+            "",
+            "# Salida con búfer: input() la vacía antes de cada pregunta",
+            "if hasattr(sys.stdout, 'reconfigure'):",
+            "    sys.stdout.reconfigure(line_buffering=False)",
+            "",
+        ]
+    
+    def generate_footer(self, first_scene):
+        if not first_scene:
+            return []
+        return [
+            f"if __name__ == '__main__':",
+            f"    {first_scene}()"
+        ]
+    
     def generate_scene(self, scene_name: str, instructions: List[IRInstruction]):
         lines = [f"def {scene_name}():"]
         self.indent()
@@ -39,20 +66,60 @@ class PythonCodeGenerator:
             self.dedent()
             return lines
         
-        for inst in instructions:
-            for line in self.generate_instruction(inst):
-                lines.append(self.get_indent() + line)
+        for line in self.generate_block(instructions):
+            lines.append(self.get_indent() + line)
         
         self.dedent()
         return lines
     
+    def generate_block(self, instructions: List[IRInstruction]):
+        """Líneas de una secuencia de instrucciones, sin sangría"""
+        if not self.buffered:
+            return [line for inst in instructions for line in self.generate_instruction(inst)]
+        lines = []
+        pending = []  # Textos de los PRINT seguidos aún no escritos
+        for inst in instructions:
+            if inst.op == "PRINT":
+                pending.append(inst.arg1)
+                continue
+            if pending:
+                lines.append(self.generate_write(pending))
+                pending = []
+            lines.extend(self.generate_instruction(inst))
+        if pending:
+            lines.append(self.generate_write(pending))
+        return lines
+    
+    def generate_write(self, texts: List[str]):
+        text = "".join(f"{t}\n" for t in texts).replace("\n", "\\n")
+        return f'sys.stdout.write("{text}")'
+    
     def generate_instruction(self, inst: IRInstruction):
         if inst.op == "PRINT":
-            return [f'print("{inst.arg1}")']
+            # Un PRINT unido por el optimizador trae varias líneas
+            text = inst.arg1.replace("\n", "\\n")
+            return [f'print("{text}")']
         elif inst.op == "OPTION":
             return [
                 f'opcion = input("{inst.arg1} -> ")',
                 f'if opcion.strip():',
                 f'    {inst.arg2}()'
             ]
+        elif inst.op == "BRANCH":
+            # Escena incrustada por el optimizador: su cuerpo va dentro del if
+            target, body = inst.arg2
+            lines = [
+                f'opcion = input("{inst.arg1} -> ")',
+                f'if opcion.strip():',
+                f'    # {target}'
+            ]
+            body_lines = self.generate_block(body)
+            body_lines.extend(self.generate_branch_end())
+            lines.extend("    " + line for line in body_lines or ["pass"])
+            return lines
+        return []
+    
+    def generate_branch_end(self):
+        # En el modo por llamadas, al terminar la escena incrustada se
+        # sigue con la escena que la contiene, igual que al volver de la llamada
         return []
@@ -1,2 +1,12 @@
-from .IRGenerator import IRGenerator
+from lazy_exports import lazy_exports
+
+from .IRInstruction import IRInstruction
 from .PythonCodeGenerator import PythonCodeGenerator
+from .DispatchCodeGenerator import DispatchCodeGenerator
+from .CompactIR import CompactIR, CompactIRBuilder, Opcode
+from .BinaryIR import write_ir, load_ir, MappedIR, IRFormatError
+from .Bytecode import write_pyc, write_bundle
+
+# IRGenerator depende del parser de ANTLR: generar código desde una IR
+# ya hecha no lo necesita
+lazy_exports(__name__, {"IRGenerator": ".IRGenerator"})
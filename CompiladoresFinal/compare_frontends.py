@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Compara el frontend ANTLR con el frontend rápido (--frontend fast)
+1. Equivalencia: misma IR y mismos errores semánticos en tests/*.txt
+   (en los que tienen errores de sintaxis: los mismos errores de
+   sintaxis tras recuperarse, y los mismos semánticos)
+2. Rendimiento: tiempo de léxico + sintaxis + semántica + IR en un
+   programa sintético grande
+3. Con --walk N: tiempo de recorrer el árbol ANTLR de N escenas en dos
+   pasadas (SemanticVisitor + IRGenerator) contra una sola (FusedVisitor)
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from frontend import AntlrFrontend, FastFrontend, FusedAntlrFrontend
+
+
+def ir_signature(ir):
+    """Convierte la IR en tuplas comparables"""
+    scenes = [
+        (name, [(inst.op, inst.arg1, inst.arg2) for inst in instructions])
+        for name, instructions in ir["scenes"].items()
+    ]
+    return scenes, ir["first_scene"]
+
+
+def check_equivalence(tests_dir="tests"):
+    """Retorna la cantidad de archivos donde los frontends no coinciden"""
+    antlr = AntlrFrontend()
+    fused = FusedAntlrFrontend()
+    fast = FastFrontend()
+    
+    mismatches = 0
+    for test_file in sorted(Path(tests_dir).glob("*.txt")):
+        text = test_file.read_text(encoding="utf-8")
+        tree = antlr.parse_text(text)
+        antlr_syntax = antlr.syntax_errors(tree)
+        
+        # Una pasada vs dos pasadas sobre el mismo árbol, incluso si ANTLR
+        # tuvo que recuperarse de errores de sintaxis (entonces la IR no
+        # se usa y solo se comparan los errores)
+        two_pass = [antlr.check(tree)]
+        one_pass = [fused.check(tree)]
+        if not antlr_syntax:
+            two_pass.append(ir_signature(antlr.build_ir(tree)))
+            one_pass.append(ir_signature(fused.build_ir(tree)))
+        if two_pass != one_pass:
+            mismatches += 1
+            print(f"{test_file.stem}: ✗ FusedVisitor difiere de las dos pasadas")
+        
+        program = fast.parse_text(text)
+        fast_syntax = fast.syntax_errors(program)
+        
+        if antlr_syntax != fast_syntax:
+            status, ok = "✗ errores de sintaxis distintos", False
+        elif antlr_syntax:
+            ok = antlr.check(tree) == fast.check(program)
+            status = (f"✓ ambos rechazan ({antlr_syntax[0]})" if ok
+                      else "✗ errores semánticos distintos tras recuperarse")
+        else:
+            same_errors = antlr.check(tree) == fast.check(program)
+            same_ir = ir_signature(antlr.build_ir(tree)) == ir_signature(fast.build_ir(program))
+            ok = same_errors and same_ir
+            status = "✓ misma IR y mismos errores" if ok else "✗ IR o errores distintos"
+        if not ok:
+            mismatches += 1
+        print(f"{test_file.stem}: {status}")
+    return mismatches
+
+
+def synthetic_program(scenes, dialogues=4):
+    """Programa válido con varias escenas encadenadas en ciclo"""
+    parts = []
+    for i in range(scenes):
+        parts.append(f"escena s{i} {{\n")
+        for j in range(dialogues):
+            parts.append(f'    decir "Escena {i}, línea {j}";\n')
+        parts.append(f'    opcion "Siguiente" ir_a s{(i + 1) % scenes};\n')
+        parts.append(f'    opcion "Inicio" ir_a s0;\n')
+        parts.append("}\n")
+    return "".join(parts)
+
+
+def time_frontend(frontend, text):
+    start = time.perf_counter()
+    tree = frontend.parse_text(text)
+    frontend.check(tree)
+    frontend.build_ir(tree)
+    return time.perf_counter() - start
+
+
+def benchmark(scenes=2000):
+    text = synthetic_program(scenes)
+    print(f"\nPrograma sintético: {scenes} escenas, {len(text) / 1024:.0f} KB")
+    antlr_time = time_frontend(AntlrFrontend(), text)
+    fast_time = time_frontend(FastFrontend(), text)
+    print(f"  antlr: {antlr_time * 1000:9.1f} ms")
+    print(f"  fast:  {fast_time * 1000:9.1f} ms")
+    print(f"  aceleración: {antlr_time / fast_time:.1f}x")
+
+
+def benchmark_tree_walk(scenes):
+    """Fases 3 y 4 sobre el mismo árbol ANTLR: dos pasadas contra una"""
+    text = synthetic_program(scenes)
+    print(f"\nRecorrido del árbol: {scenes} escenas (parseando con ANTLR...)")
+    antlr = AntlrFrontend()
+    tree = antlr.parse_text(text)
+    
+    start = time.perf_counter()
+    antlr.check(tree)
+    antlr.build_ir(tree)
+    two_pass = time.perf_counter() - start
+    
+    fused = FusedAntlrFrontend()
+    start = time.perf_counter()
+    fused.check(tree)
+    fused.build_ir(tree)
+    one_pass = time.perf_counter() - start
+    
+    print(f"  SemanticVisitor + IRGenerator: {two_pass * 1000:9.1f} ms")
+    print(f"  FusedVisitor:                  {one_pass * 1000:9.1f} ms")
+    print(f"  reducción: {(1 - one_pass / two_pass) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compara los frontends de ScriptLang")
+    arg_parser.add_argument("scenes", nargs="?", type=int, default=2000,
+                            help="escenas del programa sintético (por defecto 2000)")
+    arg_parser.add_argument("--walk", type=int, metavar="N",
+                            help="mide también el recorrido del árbol con N escenas")
+    args = arg_parser.parse_args()
+    mismatches = check_equivalence()
+    benchmark(args.scenes)
+    if args.walk:
+        benchmark_tree_walk(args.walk)
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,127 @@
+import json
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Códigos estables de cada tipo de error, para filtrarlos y contarlos sin
+# depender del texto del mensaje: SL0xx de la entrada, SL1xx léxicos y
+# sintácticos, SL2xx semánticos
+SOURCE_ERROR = "SL001"
+LEXICAL_ERROR = "SL100"
+SYNTAX_ERROR = "SL101"
+DUPLICATE_SCENE = "SL200"
+UNKNOWN_SCENE = "SL201"
+
+CODE_DESCRIPTIONS = {
+    SOURCE_ERROR: "Entrada que no existe, no se puede leer o no es válida",
+    LEXICAL_ERROR: "Texto que no forma ningún token",
+    SYNTAX_ERROR: "Error de sintaxis",
+    DUPLICATE_SCENE: "Escena duplicada",
+    UNKNOWN_SCENE: "ir_a a una escena que no existe",
+}
+
+# Formatos de write_diagnostics
+DIAGNOSTIC_FORMATS = ("jsonl", "sarif")
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """
+    Un error del compilador: código (ver CODE_DESCRIPTIONS), mensaje,
+    gravedad, archivo y el tramo del texto que señala, desde (line,
+    column) hasta (end_line, end_column) sin incluirlo. Las líneas
+    empiezan en 1 y las columnas en 0, igual que en ANTLR; al mostrarlas
+    las columnas empiezan en 1, como en los editores.
+    """
+    code: str
+    message: str
+    line: int
+    column: int
+    end_line: int
+    end_column: int
+    severity: str = "error"
+    file: Optional[str] = None
+    
+    @classmethod
+    def spanning(cls, code: str, message: str, line: int, column: int, text: str = ""):
+        """Diagnóstico sobre text, que empieza en (line, column)"""
+        newlines = text.count("\n")
+        if newlines:
+            return cls(code, message, line, column, line + newlines, len(text) - text.rindex("\n") - 1)
+        return cls(code, message, line, column, line, column + len(text))
+    
+    def in_file(self, file: Optional[str]) -> "Diagnostic":
+        return replace(self, file=file)
+    
+    def __str__(self):
+        return f"[Línea {self.line}, columna {self.column + 1}] Error: {self.message}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Una línea de --diagnostics en formato jsonl"""
+        return {
+            "file": self.file,
+            "line": self.line,
+            "column": self.column + 1,
+            "end_line": self.end_line,
+            "end_column": self.end_column + 1,
+            "severity": self.severity,
+            "code": self.code,
+            "message": self.message,
+        }
+    
+    def to_sarif(self) -> Dict[str, Any]:
+        region = {
+            "startLine": self.line,
+            "startColumn": self.column + 1,
+            "endLine": self.end_line,
+            "endColumn": self.end_column + 1,
+        }
+        location = {"region": region}
+        if self.file is not None:
+            location = {"artifactLocation": {"uri": Path(self.file).as_posix()}, **location}
+        return {
+            "ruleId": self.code,
+            "level": self.severity,
+            "message": {"text": self.message},
+            "locations": [{"physicalLocation": location}],
+        }
+
+
+def decode_error(source: bytes, error: UnicodeDecodeError, file: Optional[str] = None) -> Diagnostic:
+    """SOURCE_ERROR que señala el primer byte de source que no es UTF-8"""
+    line_start = source.rfind(b"\n", 0, error.start) + 1
+    line = source.count(b"\n", 0, error.start) + 1
+    column = len(source[line_start:error.start].decode("utf-8"))
+    message = f"'{file}' no es UTF-8 válido (línea {line}, columna {column + 1})"
+    return Diagnostic(SOURCE_ERROR, message, line, column, line, column, file=file)
+
+
+def sarif_log(diagnostics: List[Diagnostic]) -> Dict[str, Any]:
+    """Un reporte SARIF 2.1.0 con todos los diagnósticos de la ejecución"""
+    rules = [{"id": code, "shortDescription": {"text": text}}
+             for code, text in CODE_DESCRIPTIONS.items()]
+    return {
+        "$schema": SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {"driver": {"name": "ScriptLang", "rules": rules}},
+            "results": [d.to_sarif() for d in diagnostics],
+        }],
+    }
+
+
+def write_diagnostics(diagnostics: List[Diagnostic], path: str, format: str = "jsonl"):
+    """
+    Guarda los diagnósticos de una ejecución: jsonl escribe un objeto
+    JSON por línea (ver Diagnostic.to_dict) y sarif un reporte SARIF.
+    Sin errores el archivo queda vacío (jsonl) o sin resultados (sarif).
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        if format == "sarif":
+            json.dump(sarif_log(diagnostics), f, indent=2, ensure_ascii=False)
+            f.write("\n")
+            return
+        for diagnostic in diagnostics:
+            f.write(json.dumps(diagnostic.to_dict(), ensure_ascii=False) + "\n")
@@ -0,0 +1,3 @@
+from .Diagnostic import (Diagnostic, CODE_DESCRIPTIONS, DIAGNOSTIC_FORMATS, DUPLICATE_SCENE,
+                         LEXICAL_ERROR, SOURCE_ERROR, SYNTAX_ERROR, UNKNOWN_SCENE, decode_error,
+                         sarif_log, write_diagnostics)
@@ -0,0 +1,178 @@
+from typing import List
+from antlr4 import CommonTokenStream, FileStream, InputStream, Lexer, Token
+from antlr4.atn.ATNState import ATNState
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+from antlr4.IntervalSet import IntervalSet
+from generated.ScriptLangLexer import ScriptLangLexer
+from generated.ScriptLangParser import ScriptLangParser
+from diagnostics.Diagnostic import Diagnostic, LEXICAL_ERROR, SYNTAX_ERROR
+from semantic_analyzer.SemanticVisitor import SemanticVisitor, name_token
+from semantic_analyzer.FusedVisitor import FusedVisitor
+from code_generator.IRGenerator import IRGenerator
+from .DfaSnapshot import restore_dfa_snapshot
+
+
+class DiagnosticListener(ErrorListener):
+    """
+    Junta los errores léxicos y sintácticos en vez de imprimirlos en
+    stderr. Cada uno señala el texto que lo causó: el que el lexer no
+    reconoció o el token inesperado (nada si es el final del archivo).
+    """
+    def __init__(self):
+        self.errors: List[Diagnostic] = []
+    
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        if isinstance(recognizer, Lexer):
+            # El mismo texto con el que el lexer arma el mensaje
+            text = recognizer._input.getText(recognizer._tokenStartCharIndex, recognizer._input.index)
+            self.errors.append(Diagnostic.spanning(LEXICAL_ERROR, msg, line, column, text))
+            return
+        text = "" if offendingSymbol.type == Token.EOF else offendingSymbol.text
+        self.errors.append(Diagnostic.spanning(SYNTAX_ERROR, msg, line, column, text))
+
+
+class SceneErrorStrategy(DefaultErrorStrategy):
+    """
+    La recuperación por defecto de ANTLR, que en esta gramática ya
+    resincroniza donde conviene: en el siguiente 'decir', 'opcion' o '}'
+    dentro de una escena, y en la siguiente 'escena' fuera de ella.
+    
+    Corrige sync() al repetir un bucle: en el runtime de Python agrega el
+    conjunto de recuperación al de tokens esperados que el ATN guarda en
+    caché, así que tras el primer error los mensajes (y dónde se
+    resincroniza) dependían de los archivos analizados antes en el mismo
+    proceso. Aquí se trabaja sobre una copia.
+    """
+    LOOP_BACK = (ATNState.PLUS_LOOP_BACK, ATNState.STAR_LOOP_BACK)
+    
+    def sync(self, recognizer):
+        state = recognizer._interp.atn.states[recognizer.state]
+        if state.stateType not in self.LOOP_BACK or self.inErrorRecoveryMode(recognizer):
+            return super().sync(recognizer)
+        next_tokens = recognizer.atn.nextTokens(state)
+        if recognizer.getTokenStream().LA(1) in next_tokens or Token.EPSILON in next_tokens:
+            return super().sync(recognizer)
+        self.reportUnwantedToken(recognizer)
+        recovery = IntervalSet()
+        recovery.addSet(recognizer.getExpectedTokens())
+        recovery.addSet(self.getErrorRecoverySet(recognizer))
+        self.consumeUntil(recognizer, recovery)
+
+
+class AntlrFrontend:
+    """
+    Fases 1 y 2 (léxico y sintáctico) con un lexer y un parser que se
+    reutilizan entre archivos. El ATN se deserializa una sola vez por
+    proceso y el caché DFA de predicción sigue caliente de un archivo
+    al siguiente. Con una instantánea configurada (use_dfa_snapshot) el
+    DFA ya llega caliente desde una ejecución anterior.
+    
+    Ante un error de sintaxis el parser se recupera (SceneErrorStrategy)
+    y sigue: el árbol recuperado pasa al análisis semántico y
+    syntax_errors() da todos los errores juntos.
+    """
+    name = "antlr"
+    
+    def __init__(self):
+        restore_dfa_snapshot()
+        self.lexer = ScriptLangLexer(None)
+        self.parser = ScriptLangParser(None)
+        self.parser._errHandler = SceneErrorStrategy()
+        self.listener = DiagnosticListener()
+        for recognizer in (self.lexer, self.parser):
+            recognizer.removeErrorListeners()
+            recognizer.addErrorListener(self.listener)
+    
+    def parse_stream(self, input_stream: InputStream) -> ScriptLangParser.ProgramContext:
+        self.listener.errors = []
+        # Los setters reinician el estado interno del lexer y del parser
+        self.lexer.inputStream = input_stream
+        self.parser.setTokenStream(CommonTokenStream(self.lexer))
+        return self.parser.program()
+    
+    def parse_file(self, path: str) -> ScriptLangParser.ProgramContext:
+        return self.parse_stream(FileStream(path, encoding='utf-8'))
+    
+    def parse_text(self, text: str) -> ScriptLangParser.ProgramContext:
+        return self.parse_stream(InputStream(text))
+    
+    # Fases 1 y 2 por separado, para medirlas (--profile)
+    def tokenize(self, text: str) -> CommonTokenStream:
+        self.listener.errors = []
+        self.lexer.inputStream = InputStream(text)
+        tokens = CommonTokenStream(self.lexer)
+        tokens.fill()
+        return tokens
+    
+    def parse_tokens(self, tokens: CommonTokenStream) -> ScriptLangParser.ProgramContext:
+        self.parser.setTokenStream(tokens)
+        return self.parser.program()
+    
+    def token_count(self, tokens: CommonTokenStream) -> int:
+        return len(tokens.tokens)
+    
+    def node_count(self, tree: ScriptLangParser.ProgramContext) -> int:
+        """Nodos del árbol: reglas y tokens (hojas)"""
+        count = 0
+        pending = [tree]
+        while pending:
+            node = pending.pop()
+            count += 1
+            pending.extend(getattr(node, "children", None) or ())
+        return count
+    
+    def syntax_errors(self, tree: ScriptLangParser.ProgramContext) -> List[Diagnostic]:
+        """Errores léxicos y sintácticos del último análisis (el de tree)"""
+        return sorted(self.listener.errors, key=lambda e: (e.line, e.column))
+    
+    def check(self, tree: ScriptLangParser.ProgramContext):
+        semantic = SemanticVisitor()
+        semantic.visitProgram(tree)  # Recorre el AST validando
+        return semantic.errors
+    
+    def symbols(self, tree: ScriptLangParser.ProgramContext):
+        """
+        Escenas declaradas [(nombre, línea, columna)] y referencias ir_a
+        [(escena, línea, columna, destino)], sin revisarlas: en un
+        proyecto se resuelven contra las escenas de todos los archivos
+        """
+        semantic = SemanticVisitor()
+        scenes = []
+        for scene_ctx in tree.scene():
+            token = name_token(scene_ctx, ScriptLangParser.ID)
+            if token is not None:
+                scenes.append((token.text, token.line, token.column))
+            semantic.visitScene(scene_ctx)
+        return scenes, semantic.scene_references
+    
+    def build_ir(self, tree: ScriptLangParser.ProgramContext):
+        ir_gen = IRGenerator()
+        ir_gen.visitProgram(tree)
+        return ir_gen.get_ir()  # Obtiene la representación intermedia
+
+
+class FusedAntlrFrontend(AntlrFrontend):
+    """
+    Igual que AntlrFrontend, pero las fases 3 y 4 se hacen en un solo
+    recorrido del árbol con FusedVisitor. check() deja lista la IR y
+    build_ir() solo la retorna.
+    """
+    name = "fused"
+    
+    def __init__(self):
+        super().__init__()
+        self._fused = None
+    
+    def check(self, tree: ScriptLangParser.ProgramContext):
+        fused = FusedVisitor()
+        fused.visitProgram(tree)
+        self._fused = (tree, fused.get_ir())
+        return fused.errors
+    
+    def build_ir(self, tree: ScriptLangParser.ProgramContext):
+        if self._fused is None or self._fused[0] is not tree:
+            self.check(tree)
+        ir = self._fused[1]
+        self._fused = None  # No retener el árbol entre archivos
+        return ir
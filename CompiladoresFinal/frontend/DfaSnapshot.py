@@ -0,0 +1,136 @@
+import hashlib
+import os
+import pickle
+import sys
+from typing import Optional
+
+# Subir esta versión invalida las instantáneas guardadas
+SNAPSHOT_VERSION = 1
+
+# Archivo configurado con use_dfa_snapshot(); None = sin instantánea
+_snapshot_path: Optional[str] = None
+# Estados DFA que había al restaurar, para saber si vale la pena guardar
+_restored_states: Optional[int] = None
+
+
+def use_dfa_snapshot(path: Optional[str]):
+    """
+    Configura la instantánea del ATN y los DFA de ANTLR. No importa ANTLR:
+    el primer AntlrFrontend que se cree la restaura (restore_dfa_snapshot).
+    El archivo es un pickle, así que solo debe venir de una fuente confiable
+    (el propio caché de compilación).
+    """
+    global _snapshot_path
+    _snapshot_path = path
+
+
+def dfa_snapshot_path() -> Optional[str]:
+    return _snapshot_path
+
+
+def _recognizers():
+    from generated.ScriptLangLexer import ScriptLangLexer
+    from generated.ScriptLangParser import ScriptLangParser
+    return ScriptLangLexer, ScriptLangParser
+
+
+def snapshot_key() -> str:
+    """Cambia si cambia la gramática generada o el formato del ATN"""
+    from antlr4.atn.ATNDeserializer import SERIALIZED_VERSION
+    from generated import ScriptLangLexer as lexer_module
+    from generated import ScriptLangParser as parser_module
+    digest = hashlib.sha256(f"v{SNAPSHOT_VERSION};atn={SERIALIZED_VERSION};".encode())
+    digest.update(repr(lexer_module.serializedATN()).encode())
+    digest.update(repr(parser_module.serializedATN()).encode())
+    return digest.hexdigest()
+
+
+def dfa_state_count() -> int:
+    """Estados DFA que el lexer y el parser han construido en este proceso"""
+    lexer, parser = _recognizers()
+    return sum(len(dfa._states) for cls in (lexer, parser) for dfa in cls.decisionsToDFA)
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Guarda los DFA sin el ATN: cada estado del ATN se escribe como
+    (reconocedor, número de estado) y al cargar se enlaza con el ATN que
+    el módulo generado ya deserializó.
+    """
+    def __init__(self, f, atns):
+        super().__init__(f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.atns = {id(atn): name for name, atn in atns.items()}
+    
+    def persistent_id(self, obj):
+        from antlr4.atn.ATNState import ATNState
+        if isinstance(obj, ATNState) and id(obj.atn) in self.atns:
+            return ("state", self.atns[id(obj.atn)], obj.stateNumber)
+        if id(obj) in self.atns:
+            return ("atn", self.atns[id(obj)])
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, f, atns):
+        super().__init__(f)
+        self.atns = atns
+    
+    def persistent_load(self, pid):
+        kind, name = pid[0], pid[1]
+        if kind == "state":
+            return self.atns[name].states[pid[2]]
+        if kind == "atn":
+            return self.atns[name]
+        raise pickle.UnpicklingError(f"referencia desconocida: {pid!r}")
+
+
+def restore_dfa_snapshot() -> bool:
+    """
+    Reemplaza los DFA compartidos (atributos de clase del lexer y del
+    parser generados) por los de la instantánea, si existe y coincide con
+    la gramática actual. Debe llamarse antes de crear el lexer y el
+    parser; solo se restaura una vez por proceso.
+    """
+    global _restored_states
+    if _snapshot_path is None or _restored_states is not None:
+        return False
+    lexer, parser = _recognizers()
+    _restored_states = 0
+    try:
+        with open(_snapshot_path, "rb") as f:
+            snapshot = _SnapshotUnpickler(f, {"lexer": lexer.atn, "parser": parser.atn}).load()
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+            IndexError, KeyError):
+        return False
+    if not isinstance(snapshot, dict) or snapshot.get("key") != snapshot_key():
+        return False
+    lexer.decisionsToDFA = snapshot["lexer"]
+    parser.decisionsToDFA, parser.sharedContextCache = snapshot["parser"]
+    _restored_states = dfa_state_count()
+    return True
+
+
+def save_dfa_snapshot(force: bool = False) -> bool:
+    """
+    Guarda los DFA calientes de este proceso si se configuró una
+    instantánea y el DFA creció desde que se restauró (o con force=True).
+    Si ANTLR no se usó en este proceso no hay nada que guardar.
+    """
+    if _snapshot_path is None or "generated.ScriptLangParser" not in sys.modules:
+        return False
+    states = dfa_state_count()
+    if not force and states <= (_restored_states or 0):
+        return False
+    lexer, parser = _recognizers()
+    snapshot = {
+        "key": snapshot_key(),
+        "lexer": lexer.decisionsToDFA,
+        "parser": (parser.decisionsToDFA, parser.sharedContextCache),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(_snapshot_path)), exist_ok=True)
+    # Escritura atómica, igual que BuildCache.store
+    tmp_path = f"{_snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        _SnapshotPickler(f, {"lexer": lexer.atn, "parser": parser.atn}).dump(snapshot)
+    os.replace(tmp_path, _snapshot_path)
+    return True
@@ -0,0 +1,485 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from code_generator.IRInstruction import IRInstruction
+from diagnostics.Diagnostic import Diagnostic, LEXICAL_ERROR, SYNTAX_ERROR
+from semantic_analyzer.SemanticChecker import SemanticChecker
+
+# Un solo patrón con todas las reglas léxicas de ScriptLang.g4. El orden
+# importa igual que en ANTLR: las palabras clave se reconocen como ID y
+# luego se separan, así "escenas" sigue siendo un ID (coincidencia más larga).
+TOKEN_PATTERN = re.compile(r'''
+    (?P<WS>[ \t\r\n]+)
+  | (?P<LINE_COMMENT>//[^\r\n]*)
+  | (?P<BLOCK_COMMENT>/\*.*?\*/)
+  | (?P<ID>[a-zA-Z_][a-zA-Z_0-9]*)
+  | (?P<STRING>"[^"\r\n]*")
+  | (?P<PUNCT>[{};])
+''', re.VERBOSE | re.DOTALL)
+
+KEYWORDS = frozenset(("escena", "decir", "opcion", "ir_a"))
+SKIPPED = frozenset(("WS", "LINE_COMMENT", "BLOCK_COMMENT"))
+
+# Un string sin cerrar: ANTLR lo descarta entero, hasta el fin de línea
+UNCLOSED_STRING = re.compile(r'"[^"\r\n]*[\r\n]?')
+
+# Tokens que pueden seguir a una sentencia y a una escena: ahí se
+# resincroniza el parser tras un error
+STATEMENT_FOLLOW = ("decir", "opcion", "}")
+SCENE_FOLLOW = ("escena", "EOF")
+
+
+class FastSyntaxError(Exception):
+    """Un error léxico o sintáctico; text es el texto que lo causó"""
+    def __init__(self, line: int, column: int, message: str, text: str = "",
+                 code: str = SYNTAX_ERROR):
+        super().__init__(f"line {line}:{column} {message}")
+        self.line = line
+        self.column = column
+        self.message = message
+        self.text = text
+        self.code = code
+    
+    @property
+    def diagnostic(self) -> Diagnostic:
+        return Diagnostic.spanning(self.code, self.message, self.line, self.column, self.text)
+
+
+@dataclass
+class ParsedProgram:
+    """
+    Resultado del frontend rápido: declaraciones [(nombre, línea,
+    columna)], referencias [(escena, línea, columna, destino)] e IR. Las
+    posiciones son las del nombre de la escena y las del destino.
+    """
+    scenes: List[Tuple[str, int, int]] = field(default_factory=list)
+    references: List[Tuple[str, int, int, str]] = field(default_factory=list)
+    ir: Dict = field(default_factory=dict)
+    syntax_errors: List[Diagnostic] = field(default_factory=list)
+
+
+# Tamaño de cada lectura al tokenizar un archivo por partes
+CHUNK_SIZE = 1 << 16
+
+
+def display_text(text: str) -> str:
+    """Texto de un token en un mensaje, con los saltos escapados como en ANTLR"""
+    return text.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+
+
+def token_display(token) -> str:
+    return f"'{display_text(token[1])}'"
+
+
+def token_span(token) -> str:
+    """Texto que señala un error en token: nada si es el final"""
+    return "" if token[0] == "EOF" else token[1]
+
+
+def unexpected(token, message: str) -> FastSyntaxError:
+    return FastSyntaxError(token[2], token[3], message, token_span(token))
+
+
+def iter_tokens(read, chunk_size: int = CHUNK_SIZE):
+    """
+    Genera los tokens (tipo, texto, línea, columna) leyendo el texto por
+    partes con read(n). Un token que toca el final del búfer puede estar
+    cortado (un ID, un string o un comentario de bloque a medias), así que
+    antes de aceptarlo se lee la siguiente parte y se vuelve a intentar.
+    Las palabras clave y la puntuación usan su propio texto como tipo.
+    """
+    buffer = read(chunk_size)
+    eof = not buffer
+    line = 1
+    line_start = 0
+    pos = 0
+    match = TOKEN_PATTERN.match
+    while True:
+        end = len(buffer)
+        if pos >= end and eof:
+            break
+        m = match(buffer, pos)
+        if (m is None or m.end() == end) and not eof:
+            chunk = read(chunk_size)
+            eof = not chunk
+            # Descarta lo ya consumido para que la memoria no crezca
+            buffer = buffer[pos:] + chunk
+            line_start -= pos
+            pos = 0
+            continue
+        if m is None:
+            raise FastSyntaxError(line, pos - line_start,
+                                  f"token recognition error at: '{buffer[pos]}'",
+                                  buffer[pos], LEXICAL_ERROR)
+        kind = m.lastgroup
+        value = m.group()
+        if kind not in SKIPPED:
+            if kind == "ID":
+                if value in KEYWORDS:
+                    kind = value
+            elif kind == "PUNCT":
+                kind = value
+            yield (kind, value, line, pos - line_start)
+        newlines = value.count("\n")
+        if newlines:
+            line += newlines
+            line_start = pos + value.rindex("\n") + 1
+        pos = m.end()
+    yield ("EOF", "<EOF>", line, pos - line_start)
+
+
+def tokenize(text: str, pos: int = 0, end: Optional[int] = None, line: int = 1,
+             errors: Optional[List[Diagnostic]] = None):
+    """
+    Convierte un texto ya cargado en memoria en la lista de tokens. Es el
+    mismo análisis que iter_tokens, sin la lógica de recarga del búfer.
+    Con pos, end y line se analiza solo text[pos:end], que empieza en la
+    línea line (IncrementalCompiler reanaliza así las escenas editadas);
+    ningún token puede pasar de end.
+    Con una lista errors el texto no reconocido se anota ahí y se salta,
+    como hace el lexer de ANTLR, en lugar de detenerse.
+    """
+    tokens = []
+    line_start = text.rfind("\n", 0, pos) + 1
+    if end is None:
+        end = len(text)
+    match = TOKEN_PATTERN.match
+    while pos < end:
+        m = match(text, pos, end)
+        if m is None:
+            if errors is None:
+                raise FastSyntaxError(line, pos - line_start,
+                                      f"token recognition error at: '{text[pos]}'",
+                                      text[pos], LEXICAL_ERROR)
+            skip = UNCLOSED_STRING.match(text, pos, end).end() if text[pos] == '"' else pos + 1
+            errors.append(Diagnostic.spanning(LEXICAL_ERROR, "token recognition error at: "
+                                              f"'{display_text(text[pos:skip])}'",
+                                              line, pos - line_start, text[pos:skip]))
+            if text[skip - 1] == "\n":
+                line += 1
+                line_start = skip
+            pos = skip
+            continue
+        kind = m.lastgroup
+        value = m.group()
+        if kind not in SKIPPED:
+            if kind == "ID":
+                if value in KEYWORDS:
+                    kind = value
+            elif kind == "PUNCT":
+                kind = value
+            tokens.append((kind, value, line, pos - line_start))
+        newlines = value.count("\n")
+        if newlines:
+            line += newlines
+            line_start = pos + value.rindex("\n") + 1
+        pos = m.end()
+    tokens.append(("EOF", "<EOF>", line, pos - line_start))
+    return tokens
+
+
+class FastParser:
+    """
+    Parser descendente recursivo para ScriptLang.g4:
+    
+        program   : scene+ EOF
+        scene     : 'escena' ID '{' dialogue+ '}'
+        dialogue  : 'decir' STRING ';' | 'opcion' STRING 'ir_a' ID ';'
+    
+    Genera las instrucciones IR mientras reconoce cada escena, así que no
+    construye un árbol intermedio. Se detiene en el primer error.
+    """
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+    
+    def expect(self, kind: str):
+        token = self.tokens[self.pos]
+        if token[0] != kind:
+            expected = kind if kind in ("ID", "STRING", "EOF") else f"'{kind}'"
+            raise unexpected(token, f"mismatched input '{token[1]}' expecting {expected}")
+        self.pos += 1
+        return token
+    
+    def parse_program(self) -> ParsedProgram:
+        result = ParsedProgram()
+        scenes: Dict[str, List[IRInstruction]] = {}
+        tokens = self.tokens
+        self.parse_scene(result, scenes)
+        while tokens[self.pos][0] == "escena":
+            self.parse_scene(result, scenes)
+        self.expect("EOF")
+        result.ir = {"scenes": scenes, "first_scene": result.scenes[0][0]}
+        return result
+    
+    def parse_scene(self, result: ParsedProgram, scenes):
+        self.expect("escena")
+        _, scene_name, line, column = self.expect("ID")
+        self.expect("{")
+        result.scenes.append((scene_name, line, column))
+        instructions = []
+        scenes[scene_name] = instructions
+        tokens = self.tokens
+        while True:
+            kind = tokens[self.pos][0]
+            if kind == "decir":
+                self.pos += 1
+                text = self.expect("STRING")[1][1:-1]
+                self.expect(";")
+                instructions.append(IRInstruction("PRINT", text))
+            elif kind == "opcion":
+                self.pos += 1
+                text = self.expect("STRING")[1][1:-1]
+                self.expect("ir_a")
+                _, target, line, column = self.expect("ID")
+                self.expect(";")
+                result.references.append((scene_name, line, column, target))
+                instructions.append(IRInstruction("OPTION", text, target))
+            elif instructions:
+                break
+            else:
+                raise unexpected(tokens[self.pos], f"mismatched input '{tokens[self.pos][1]}' "
+                                                   f"expecting {{'decir', 'opcion'}}")
+        self.expect("}")
+
+
+class RecoveringParser(FastParser):
+    """
+    FastParser que no se detiene en el primer error: anota cada error en
+    errors y se recupera en los mismos puntos que ANTLR (ver
+    SceneErrorStrategy), con los mismos mensajes:
+    - un token sobrante se descarta, y uno que falta se supone (con texto
+      None) si el token actual es el que iría después;
+    - si no alcanza, se saltan tokens hasta el siguiente 'decir',
+      'opcion' o '}' dentro de una escena, o hasta la siguiente 'escena';
+    - después de un error no se reporta otro hasta reconocer un token,
+      como el modo de recuperación de ANTLR, para no encadenar errores.
+    Las escenas sin nombre y las sentencias incompletas no entran a las
+    declaraciones ni a la IR.
+    """
+    def __init__(self, tokens, errors: List[Diagnostic]):
+        super().__init__(tokens)
+        self.errors = errors
+        self.recovering = False
+    
+    def report(self, token, message: str):
+        if not self.recovering:
+            self.errors.append(Diagnostic.spanning(SYNTAX_ERROR, message, token[2], token[3],
+                                                   token_span(token)))
+        self.recovering = True
+    
+    def report_error(self, error: FastSyntaxError):
+        if not self.recovering:
+            self.errors.append(error.diagnostic)
+        self.recovering = True
+    
+    def expect(self, kind: str, follow=()):
+        """
+        Como FastParser.expect; follow son los tipos de token que pueden
+        ir justo después de kind, para suponer el token que falta
+        """
+        tokens = self.tokens
+        token = tokens[self.pos]
+        if token[0] == kind:
+            self.pos += 1
+            self.recovering = False
+            return token
+        expected = kind if kind in ("ID", "STRING", "EOF") else f"'{kind}'"
+        if token[0] != "EOF" and tokens[self.pos + 1][0] == kind:
+            self.report(token, f"extraneous input {token_display(token)} expecting {expected}")
+            self.pos += 2
+            self.recovering = False
+            return tokens[self.pos - 1]
+        if token[0] in follow:
+            self.report(token, f"missing {expected} at {token_display(token)}")
+            return (kind, None, token[2], token[3])
+        raise unexpected(token, f"mismatched input {token_display(token)} expecting {expected}")
+    
+    def sync_entry(self, kinds, expected: str):
+        """Antes de un bucle: se descarta un token sobrante, o se falla"""
+        token = self.tokens[self.pos]
+        if self.recovering or token[0] in kinds:
+            return
+        if token[0] != "EOF" and self.tokens[self.pos + 1][0] in kinds:
+            self.report(token, f"extraneous input {token_display(token)} expecting {expected}")
+            self.pos += 1
+            self.recovering = False
+            return
+        raise unexpected(token, f"mismatched input {token_display(token)} expecting {expected}")
+    
+    def sync_loop(self, kinds, expected: str, recovery=()):
+        """Al repetir un bucle: se saltan los tokens sobrantes"""
+        token = self.tokens[self.pos]
+        if self.recovering or token[0] in kinds:
+            return
+        self.report(token, f"extraneous input {token_display(token)} expecting {expected}")
+        self.skip_until(kinds + recovery)
+    
+    def skip_until(self, kinds):
+        """Descarta tokens hasta uno de kinds (o el final)"""
+        tokens = self.tokens
+        while tokens[self.pos][0] not in kinds and tokens[self.pos][0] != "EOF":
+            self.pos += 1
+    
+    def parse_program(self) -> ParsedProgram:
+        result = ParsedProgram()
+        scenes: Dict[str, List[IRInstruction]] = {}
+        try:
+            self.sync_entry(("escena",), "'escena'")
+            while True:
+                self.parse_scene(result, scenes)
+                self.sync_loop(SCENE_FOLLOW, "{<EOF>, 'escena'}")
+                if self.tokens[self.pos][0] != "escena":
+                    break
+            self.expect("EOF")
+        except FastSyntaxError as e:
+            # Como ANTLR: un error fuera de las escenas descarta el resto
+            self.report_error(e)
+            self.pos = len(self.tokens) - 1
+        first_scene = result.scenes[0][0] if result.scenes else None
+        result.ir = {"scenes": scenes, "first_scene": first_scene}
+        return result
+    
+    def parse_scene(self, result: ParsedProgram, scenes):
+        try:
+            self.expect("escena")
+            _, scene_name, line, column = self.expect("ID", ("{",))
+            # La escena se declara aunque falle lo que sigue, como en el árbol de ANTLR
+            instructions = []
+            if scene_name is not None:
+                result.scenes.append((scene_name, line, column))
+                scenes[scene_name] = instructions
+            self.expect("{", ("decir", "opcion"))
+            self.sync_entry(("decir", "opcion"), "{'decir', 'opcion'}")
+            tokens = self.tokens
+            while True:
+                self.parse_dialogue(result, scene_name, instructions)
+                kind = tokens[self.pos][0]
+                if kind == "decir" or kind == "opcion":
+                    continue
+                if kind != "}":
+                    self.sync_loop(STATEMENT_FOLLOW, "{'}', 'decir', 'opcion'}", SCENE_FOLLOW)
+                    if tokens[self.pos][0] in ("decir", "opcion"):
+                        continue
+                break
+            self.expect("}", SCENE_FOLLOW)
+        except FastSyntaxError as e:
+            self.report_error(e)
+            self.skip_until(SCENE_FOLLOW)
+    
+    def parse_dialogue(self, result: ParsedProgram, scene_name: Optional[str], instructions):
+        token = self.tokens[self.pos]
+        kind = token[0]
+        try:
+            if kind == "decir":
+                self.expect("decir")
+                text = self.expect("STRING", (";",))[1]
+                if text is not None:
+                    instructions.append(IRInstruction("PRINT", text[1:-1]))
+                self.expect(";", STATEMENT_FOLLOW)
+            elif kind == "opcion":
+                self.expect("opcion")
+                text = self.expect("STRING", ("ir_a",))[1]
+                self.expect("ir_a", ("ID",))
+                _, target, line, column = self.expect("ID", (";",))
+                # La referencia cuenta aunque falte el ';', como en el árbol de ANTLR
+                if target is not None:
+                    result.references.append((scene_name, line, column, target))
+                    if text is not None:
+                        instructions.append(IRInstruction("OPTION", text[1:-1], target))
+                self.expect(";", STATEMENT_FOLLOW)
+            else:
+                # Solo pasa en modo recuperación, así que no se reporta
+                raise unexpected(token, f"no viable alternative at input {token_display(token)}")
+        except FastSyntaxError as e:
+            self.report_error(e)
+            self.skip_until(STATEMENT_FOLLOW + SCENE_FOLLOW)
+
+
+class FastFrontend:
+    """
+    Frontend escrito a mano, alternativo a ANTLR. Un tokenizador por
+    expresión regular y un parser descendente recursivo producen la misma
+    IR que IRGenerator y los mismos errores semánticos que
+    SemanticVisitor para programas sintácticamente válidos. Con errores de
+    sintaxis se recupera como ANTLR y los reporta todos (syntax_errors).
+    """
+    name = "fast"
+    
+    def parse_text(self, text: str) -> ParsedProgram:
+        return self.parse_tokens(self.tokenize(text))
+    
+    # Fases 1 y 2 por separado, para medirlas (--profile). Los tokens
+    # viajan junto con los errores del lexer.
+    def tokenize(self, text: str):
+        errors = []
+        return tokenize(text, errors=errors), errors
+    
+    def parse_tokens(self, tokens) -> ParsedProgram:
+        tokens, errors = tokens
+        errors = list(errors)
+        program = RecoveringParser(tokens, errors).parse_program()
+        program.syntax_errors = sorted(errors, key=lambda e: (e.line, e.column))
+        return program
+    
+    def token_count(self, tokens) -> int:
+        return len(tokens[0])
+    
+    def syntax_errors(self, program: ParsedProgram) -> List[Diagnostic]:
+        return program.syntax_errors
+    
+    def node_count(self, program: ParsedProgram) -> int:
+        """
+        No hay árbol: cuenta las reglas reconocidas (el programa, sus
+        escenas y sus diálogos), sin los tokens que ANTLR pone de hojas.
+        """
+        return 1 + len(program.scenes) + sum(len(insts) for insts in program.ir["scenes"].values())
+    
+    def parse_file(self, path: str) -> ParsedProgram:
+        with open(path, encoding='utf-8') as f:
+            return self.parse_text(f.read())
+    
+    def check(self, program: ParsedProgram) -> List[Diagnostic]:
+        semantic = SemanticChecker()
+        for scene_name, line, column in program.scenes:
+            semantic.declare_scene(scene_name, line, column)
+        semantic.scene_references = program.references
+        semantic.check_references()
+        return semantic.errors
+    
+    def symbols(self, program: ParsedProgram):
+        """Escenas declaradas y referencias ir_a, sin revisarlas (ver AntlrFrontend.symbols)"""
+        return program.scenes, program.references
+    
+    def build_ir(self, program: ParsedProgram):
+        return program.ir
+    
+    def iter_scenes(self, read, chunk_size: int = CHUNK_SIZE):
+        """
+        Analiza el texto escena por escena, leyéndolo por partes con
+        read(n). Genera (nombre, línea, columna, instrucciones, referencias) por
+        cada escena, así que en memoria solo están los tokens de la escena
+        actual. Como 'escena' no puede aparecer dentro de una escena, cada
+        grupo de tokens entre dos 'escena' es exactamente una escena.
+        """
+        tokens = iter_tokens(read, chunk_size)
+        group = [next(tokens)]
+        if group[0][0] != "escena":
+            FastParser(group).expect("escena")
+        for token in tokens:
+            if token[0] == "escena" or token[0] == "EOF":
+                yield self.parse_scene_tokens(group, token)
+                group = [token]
+            else:
+                group.append(token)
+    
+    def parse_scene_tokens(self, group, terminator):
+        parser = FastParser(group + [terminator])
+        result = ParsedProgram()
+        scenes = {}
+        parser.parse_scene(result, scenes)
+        if parser.pos != len(group):
+            token = group[parser.pos]
+            raise unexpected(token, f"extraneous input '{token[1]}' expecting {{<EOF>, 'escena'}}")
+        scene_name, line, column = result.scenes[0]
+        return scene_name, line, column, scenes[scene_name], result.references
@@ -0,0 +1,28 @@
+import importlib
+
+from lazy_exports import lazy_exports
+
+from .FastFrontend import FastFrontend
+from .DfaSnapshot import use_dfa_snapshot, save_dfa_snapshot, dfa_snapshot_path
+
+# Nombre de cada frontend -> (submódulo, clase). El de ANTLR tarda en
+# cargar, así que se importa al crear el frontend y no antes.
+FRONTENDS = {
+    "antlr": (".AntlrFrontend", "AntlrFrontend"),
+    "fused": (".AntlrFrontend", "FusedAntlrFrontend"),
+    "fast": (".FastFrontend", "FastFrontend"),
+}
+
+lazy_exports(__name__, {
+    "AntlrFrontend": ".AntlrFrontend",
+    "FusedAntlrFrontend": ".AntlrFrontend",
+})
+
+
+def frontend_class(name: str = "antlr"):
+    module, class_name = FRONTENDS[name]
+    return getattr(importlib.import_module(module, __name__), class_name)
+
+
+def create_frontend(name: str = "antlr"):
+    return frontend_class(name)()
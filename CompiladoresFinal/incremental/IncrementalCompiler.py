@@ -0,0 +1,326 @@
+import bisect
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from code_generator.DispatchCodeGenerator import DispatchCodeGenerator
+from code_generator.IRInstruction import IRInstruction
+from code_generator.PythonCodeGenerator import PythonCodeGenerator
+from diagnostics.Diagnostic import Diagnostic, DUPLICATE_SCENE
+from frontend.FastFrontend import FastFrontend, FastParser, FastSyntaxError, ParsedProgram, tokenize
+from optimizer.Optimizer import merge_print_run
+from semantic_analyzer.NameIndex import NameIndex
+from semantic_analyzer.SemanticChecker import SemanticChecker
+
+# Bloque con el que se comparan los textos viejo y nuevo
+DIFF_BLOCK = 1 << 16
+
+
+@dataclass(eq=False)
+class SceneEntry:
+    """
+    Una escena del archivo y su tramo de texto: desde su 'escena' hasta
+    la siguiente (la primera empieza en 0, con los comentarios iniciales).
+    Las posiciones del nombre y de los destinos de ir_a se guardan
+    relativas al inicio del tramo (ver span_position), así editar una
+    escena no obliga a tocar las que siguen.
+    """
+    name: str
+    length: int
+    newlines: int
+    line_offset: int
+    column: int
+    instructions: List[IRInstruction]
+    references: List[Tuple[int, int, str]]
+    code: str = ""
+
+
+@dataclass
+class UpdateResult:
+    success: bool
+    # Escenas reanalizadas y escenas del archivo
+    reparsed: int = 0
+    scenes: int = 0
+    # True si hubo que analizar el archivo completo
+    full: bool = False
+    changed: bool = True
+    # Con un error de sintaxis, todos los del archivo (como en una compilación normal)
+    syntax_errors: List[Diagnostic] = field(default_factory=list)
+    errors: List[Diagnostic] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def common_prefix(a: str, b: str, limit: int) -> int:
+    """Largo del prefijo común de a y b (hasta limit), comparando por bloques"""
+    pos = 0
+    while pos < limit:
+        step = min(DIFF_BLOCK, limit - pos)
+        if a[pos:pos + step] == b[pos:pos + step]:
+            pos += step
+            continue
+        # La diferencia está en este bloque: búsqueda binaria dentro de él
+        lo, hi = 0, step
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if a[pos:pos + mid + 1] == b[pos:pos + mid + 1]:
+                lo = mid + 1
+            else:
+                hi = mid
+        return pos + lo
+    return limit
+
+
+def common_suffix(a: str, b: str, limit: int) -> int:
+    """Largo del sufijo común de a y b (hasta limit), igual que common_prefix"""
+    end_a, end_b = len(a), len(b)
+    size = 0
+    while size < limit:
+        step = min(DIFF_BLOCK, limit - size)
+        if a[end_a - size - step:end_a - size] == b[end_b - size - step:end_b - size]:
+            size += step
+            continue
+        lo, hi = 0, step
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if a[end_a - size - mid - 1:end_a - size] == b[end_b - size - mid - 1:end_b - size]:
+                lo = mid + 1
+            else:
+                hi = mid
+        return size + lo
+    return limit
+
+
+def span_position(line: int, column: int, span_line: int, span_column: int):
+    """
+    (line, column) relativa al tramo que empieza en (span_line,
+    span_column). En la primera línea del tramo la columna también es
+    relativa, porque depende del texto que hay antes del tramo.
+    """
+    if line == span_line:
+        return 0, column - span_column
+    return line - span_line, column
+
+
+class IncrementalCompiler:
+    """
+    Compilador residente para --watch. update(texto) compara el texto
+    nuevo con el anterior y solo vuelve a analizar las escenas cuyo tramo
+    cambió (más las vecinas que lo tocan): el resto conserva su IR y su
+    código generado. La semántica se revisa solo en las referencias ir_a
+    de las escenas reanalizadas y en las que apuntan a escenas que
+    aparecieron o desaparecieron.
+    
+    Usa el lexer y el parser del frontend rápido. Si el tramo editado no
+    se puede analizar por separado (por ejemplo, un comentario de bloque
+    que ahora abarca otras escenas) se analiza el archivo completo.
+    """
+    def __init__(self, dispatch: bool = False, buffered: bool = False, merge_prints: bool = False):
+        self.dispatch = dispatch
+        self.generator = DispatchCodeGenerator(buffered) if dispatch else PythonCodeGenerator(buffered)
+        self.merge_prints = merge_prints
+        # Texto que describen las entradas: el del último análisis exitoso
+        self.text: Optional[str] = None
+        self.entries: List[SceneEntry] = []
+        self.declarations: Dict[str, List[SceneEntry]] = {}
+        self.referrers: Dict[str, Set[SceneEntry]] = {}
+        self.unresolved: Dict[SceneEntry, List[Tuple[int, int, str]]] = {}
+        # Nombres declarados, para sugerir uno en las referencias sin resolver
+        self.scene_index = NameIndex()
+    
+    def update(self, text: str) -> UpdateResult:
+        start = time.perf_counter()
+        if text == self.text:
+            errors = self.errors()
+            return UpdateResult(not errors, scenes=len(self.entries), changed=False, errors=errors)
+        
+        first, last, region_start, region_end, line = self.changed_region(text)
+        full = self.text is None or (first, last) == (0, len(self.entries))
+        try:
+            new_entries = self.parse_region(text, region_start, region_end, line)
+        except FastSyntaxError as e:
+            new_entries = None
+            error = e
+        if new_entries is None and not full:
+            # Reintento con el archivo completo, que da el error correcto
+            first, last, full = 0, len(self.entries), True
+            try:
+                new_entries = self.parse_region(text, 0, len(text), 1)
+            except FastSyntaxError as e:
+                error = e
+        if new_entries is None:
+            # Las entradas siguen describiendo el último texto válido. Los
+            # errores se buscan con el parser que se recupera, que los
+            # encuentra todos
+            frontend = FastFrontend()
+            syntax_errors = frontend.syntax_errors(frontend.parse_text(text)) or [error.diagnostic]
+            return UpdateResult(False, full=full, syntax_errors=syntax_errors,
+                                seconds=time.perf_counter() - start)
+        
+        self.replace_entries(first, last, new_entries)
+        self.text = text
+        errors = self.errors()
+        return UpdateResult(not errors, reparsed=len(new_entries), scenes=len(self.entries),
+                            full=full, errors=errors, seconds=time.perf_counter() - start)
+    
+    def changed_region(self, text: str):
+        """
+        Entradas afectadas [first, last) y su tramo en el texto nuevo, con
+        la línea en la que empieza
+        """
+        if self.text is None:
+            return 0, 0, 0, len(text), 1
+        old = self.text
+        limit = min(len(old), len(text))
+        prefix = common_prefix(old, text, limit)
+        suffix = common_suffix(old, text, limit - prefix)
+        change_start, change_end = prefix, len(old) - suffix
+        
+        ends = list(itertools.accumulate(e.length for e in self.entries))
+        starts = [0] + ends[:-1]
+        # Se incluyen las escenas que solo tocan el cambio por un borde: un
+        # cambio pegado a un 'escena' puede unir o separar escenas
+        first = bisect.bisect_left(ends, change_start)
+        last = max(bisect.bisect_right(starts, change_end), first + 1)
+        region_start = starts[first]
+        region_end = ends[last - 1] + len(text) - len(old)
+        line = 1 + sum(e.newlines for e in self.entries[:first])
+        return first, last, region_start, region_end, line
+    
+    def parse_region(self, text: str, start: int, end: int, line: int) -> Optional[List[SceneEntry]]:
+        """
+        Analiza text[start:end] como una serie de escenas completas.
+        Retorna None si el tramo no tiene ninguna escena.
+        """
+        tokens = tokenize(text, start, end, line)
+        parser = FastParser(tokens)
+        if tokens[0][0] != "escena":
+            if start == 0 and end == len(text):
+                parser.expect("escena")  # Error igual al de una compilación normal
+            return None
+        # Inicio de cada línea del tramo, para ubicar cada 'escena'
+        line_starts = [text.rfind("\n", 0, start) + 1]
+        newline = text.find("\n", start, end)
+        while newline != -1:
+            line_starts.append(newline + 1)
+            newline = text.find("\n", newline + 1, end)
+        
+        entries = []
+        span_starts = []
+        while tokens[parser.pos][0] == "escena":
+            _, _, scene_line, column = tokens[parser.pos]
+            if entries:
+                span_start, span_line, span_column = line_starts[scene_line - line] + column, scene_line, column
+            else:
+                span_start, span_line, span_column = start, line, start - line_starts[0]
+            result = ParsedProgram()
+            scenes = {}
+            parser.parse_scene(result, scenes)
+            name, name_line, name_column = result.scenes[0]
+            instructions = scenes[name]
+            if self.merge_prints:
+                instructions = merge_print_run(instructions)
+            references = [span_position(ref_line, ref_column, span_line, span_column) + (target,)
+                          for _, ref_line, ref_column, target in result.references]
+            entries.append(SceneEntry(name, 0, 0, *span_position(name_line, name_column, span_line, span_column),
+                                      instructions, references))
+            span_starts.append(span_start)
+        parser.expect("EOF")
+        
+        span_starts.append(end)
+        for entry, span_start, span_end in zip(entries, span_starts, span_starts[1:]):
+            entry.length = span_end - span_start
+            entry.newlines = text.count("\n", span_start, span_end)
+        return entries
+    
+    def replace_entries(self, first: int, last: int, new_entries: List[SceneEntry]):
+        """Cambia las entradas [first, last) y revisa solo las referencias afectadas"""
+        removed = self.entries[first:last]
+        touched = {e.name for e in removed} | {e.name for e in new_entries}
+        declared_before = {name: name in self.declarations for name in touched}
+        
+        for entry in removed:
+            self.declarations[entry.name].remove(entry)
+            if not self.declarations[entry.name]:
+                del self.declarations[entry.name]
+            for target in {target for _, _, target in entry.references}:
+                self.referrers[target].discard(entry)
+                if not self.referrers[target]:
+                    del self.referrers[target]
+            self.unresolved.pop(entry, None)
+        for entry in new_entries:
+            self.declarations.setdefault(entry.name, []).append(entry)
+            for target in {target for _, _, target in entry.references}:
+                self.referrers.setdefault(target, set()).add(entry)
+        self.entries[first:last] = new_entries
+        
+        # Referencias a revisar: las de las escenas nuevas y las que
+        # apuntan a nombres que empezaron o dejaron de existir
+        to_check = set(new_entries)
+        for name, before in declared_before.items():
+            if before != (name in self.declarations):
+                to_check |= self.referrers.get(name, set())
+                if before:
+                    self.scene_index.discard(name)
+                else:
+                    self.scene_index.add(name)
+        for entry in to_check:
+            missing = [reference for reference in entry.references
+                       if reference[2] not in self.declarations]
+            if missing:
+                self.unresolved[entry] = missing
+            else:
+                self.unresolved.pop(entry, None)
+    
+    def errors(self) -> List[Diagnostic]:
+        """Errores semánticos, en el mismo orden que una compilación completa"""
+        duplicated = {name for name, entries in self.declarations.items() if len(entries) > 1}
+        if not duplicated and not self.unresolved:
+            return []
+        semantic = SemanticChecker()
+        seen = set()
+        missing = []
+        line = 1
+        offset = 0
+        for entry in self.entries:
+            if entry.name in duplicated:
+                if entry.name in seen:
+                    semantic.error_at(DUPLICATE_SCENE,
+                                      *self.absolute_position(line, offset, entry.line_offset, entry.column),
+                                      entry.name, f"Escena '{entry.name}' duplicada")
+                seen.add(entry.name)
+            for ref_line, ref_column, target in self.unresolved.get(entry, ()):
+                missing.append(self.absolute_position(line, offset, ref_line, ref_column) + (target,))
+            line += entry.newlines
+            offset += entry.length
+        for ref_line, ref_column, target in missing:
+            semantic.unknown_scene(ref_line, ref_column, target, self.scene_index.closest(target))
+        return semantic.errors
+    
+    def absolute_position(self, span_line: int, span_start: int, line: int, column: int):
+        """Inversa de span_position, para un tramo que empieza en span_start del texto"""
+        if line:
+            return span_line + line, column
+        return span_line, column + span_start - (self.text.rfind("\n", 0, span_start) + 1)
+    
+    def output(self) -> str:
+        """
+        Código Python del programa, igual al de una compilación completa.
+        Solo se genera el código de las escenas nuevas (code vacío).
+        """
+        if self.dispatch:
+            # Los ids del despachador siguen el orden de las escenas: si
+            # cambió el conjunto de escenas hay que renumerar todo
+            names = [e.name for e in self.entries]
+            if names != list(self.generator.scene_ids):
+                self.generator.scene_ids = {name: i for i, name in enumerate(names)}
+                for entry in self.entries:
+                    entry.code = ""
+        for entry in self.entries:
+            if not entry.code:
+                lines = self.generator.generate_scene(entry.name, entry.instructions)
+                entry.code = "\n".join(lines) + "\n\n"
+        first_scene = self.entries[0].name if self.entries else None
+        return ("\n".join(self.generator.generate_header()) + "\n"
+                + "".join(entry.code for entry in self.entries)
+                + "\n".join(self.generator.generate_footer(first_scene)))
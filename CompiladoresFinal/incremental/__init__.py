@@ -0,0 +1 @@
+from .IncrementalCompiler import IncrementalCompiler, SceneEntry, UpdateResult
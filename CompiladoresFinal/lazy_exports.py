@@ -0,0 +1,38 @@
+import importlib
+import sys
+import types
+
+
+class LazyPackage(types.ModuleType):
+    """
+    Paquete que importa algunas de sus clases solo cuando se piden, para
+    no cargar ANTLR (o asyncio) en los caminos que no lo usan.
+    
+    Cada clase vive en un submódulo con su mismo nombre. Al cargar ese
+    submódulo Python guarda el módulo en paquete.Nombre; __setattr__ lo
+    cambia por la clase, como hacía "from .Nombre import Nombre".
+    """
+    def __getattr__(self, name):
+        module_name = self.__dict__["_lazy_exports"].get(name)
+        if module_name is None:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        module = importlib.import_module(module_name, self.__name__)
+        return self.__dict__[name] if name in self.__dict__ else getattr(module, name)
+    
+    def __setattr__(self, name, value):
+        module_name = self.__dict__.get("_lazy_exports", {}).get(name)
+        if isinstance(value, types.ModuleType) and module_name is not None:
+            if value.__name__ == self.__name__ + module_name:
+                value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+def lazy_exports(package_name: str, exports):
+    """
+    Declara las clases que el paquete exporta sin importarlas todavía.
+    exports: nombre -> submódulo relativo, por ejemplo
+    {"SemanticVisitor": ".SemanticVisitor"}.
+    """
+    package = sys.modules[package_name]
+    package.__dict__["_lazy_exports"] = dict(exports)
+    package.__class__ = LazyPackage
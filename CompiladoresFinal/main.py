@@ -1,96 +1,861 @@
-# Importaciones de ANTLR4 para el análisis
-from antlr4 import FileStream, CommonTokenStream
-
-# Clases generadas por ANTLR4 desde la gramática (.g4)
-from generated.ScriptLangLexer import ScriptLangLexer
-from generated.ScriptLangParser import ScriptLangParser
+# Frontends (ANTLR4 o escrito a mano), reutilizables entre archivos.
+# ANTLR se importa solo al crear ese frontend: --help, un acierto del
+# caché o una entrada .slir no lo cargan.
+from frontend import (FastFrontend, create_frontend, dfa_snapshot_path, save_dfa_snapshot,
+                      use_dfa_snapshot)
+from frontend.FastFrontend import CHUNK_SIZE, FastSyntaxError
 
 # Nuestros módulos del compilador
-from semantic_analyzer.SemanticVisitor import SemanticVisitor
-from code_generator.IRGenerator import IRGenerator
+from semantic_analyzer.SemanticChecker import SemanticChecker
+from semantic_analyzer.SceneGraph import SceneGraph, format_graph_report
 from code_generator.PythonCodeGenerator import PythonCodeGenerator
+from code_generator.DispatchCodeGenerator import DispatchCodeGenerator
+from code_generator.CompactIR import CompactIR
+from code_generator.BinaryIR import IRFormatError, load_ir, write_ir
+from code_generator.Bytecode import write_bundle, write_pyc
+from build_cache.BuildCache import BuildCache
+from optimizer.Optimizer import Optimizer, ir_size, merge_print_run
+from incremental.IncrementalCompiler import IncrementalCompiler
+from project import ProjectCompiler, ProjectError, ProjectIndex, load_project
+from profiler.CompileProfiler import CompileProfiler, NULL_PROFILER, write_profiles
+from diagnostics.Diagnostic import (DIAGNOSTIC_FORMATS, SOURCE_ERROR, Diagnostic, decode_error,
+                                    write_diagnostics)
+from runtime.ScriptVM import ScriptVM
 
-import sys  # Para leer argumentos de consola
+from contextlib import ExitStack, redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from typing import List, Optional
+from pathlib import Path
+import argparse  # Para leer argumentos de consola
+import io   # Para capturar la salida de los procesos del pool
 import os   # Para verificar archivos
+import sys  # Para el código de salida
+import time  # Para medir el tiempo de cada archivo
+
+# Códigos de salida: 0 si todo compiló, 1 si algún archivo tuvo errores
+# (o no se pudo leer), 2 si los argumentos no sirven (como argparse)
+EXIT_OK = 0
+EXIT_ERRORS = 1
+EXIT_USAGE = 2
+
+
+@dataclass
+class CompileResult:
+    input_file: str
+    output_file: str
+    success: bool
+    seconds: float
+    log: str = ""
+    profile: Optional[dict] = None
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+
+
+def report_input_error(message, input_file, diagnostics=None):
+    """Muestra un error de la entrada y lo agrega a diagnostics (si se pasa)"""
+    print(f"Error: {message}")
+    if diagnostics is not None:
+        diagnostics.append(Diagnostic(SOURCE_ERROR, message, 1, 0, 1, 0, file=input_file))
 
 
-def compile_file(input_file, output_file):
+def read_source(input_file, diagnostics=None):
+    """Bytes de la fuente, o None si no se pudo leer (error ya mostrado)"""
+    try:
+        with open(input_file, 'rb') as f:
+            return f.read()
+    except OSError as e:
+        report_input_error(f"no se pudo leer '{input_file}': {e.strerror}", input_file, diagnostics)
+        return None
+
+
+def decode_source(source, input_file, diagnostics=None):
     """
-    Función principal que ejecuta las 5 fases del compilador
+    Texto de la fuente, o None si no es UTF-8 válido: el error señala el
+    primer byte inválido
     """
-    
-    # Verificar que el archivo de entrada existe
-    if not os.path.exists(input_file):
-        print(f"Error: '{input_file}' no existe")
-        return False
-    
-    print(f"\nCompilando: {input_file}")
-    
-    # === FASE 1 y 2: Análisis léxico y sintáctico ===
     try:
-        # Leer el archivo fuente
-        input_stream = FileStream(input_file, encoding='utf-8')
-        
-        # LÉXICO: El lexer convierte el texto en tokens
-        # Ej: "escena inicio" -> [TOKEN_ESCENA, TOKEN_ID]
-        lexer = ScriptLangLexer(input_stream)
-        tokens = CommonTokenStream(lexer)
-        
-        # SINTÁCTICO: El parser verifica la estructura y crea el AST
-        # Valida que siga las reglas de la gramática
-        parser = ScriptLangParser(tokens)
-        tree = parser.program()  # Árbol de sintaxis abstracta
-        
-    except Exception as e:
-        print(f"Error de sintaxis: {e}")
-        return False
+        return source.decode('utf-8')
+    except UnicodeDecodeError as e:
+        error = decode_error(source, e, input_file)
+        print(f"Error: {error.message}")
+        if diagnostics is not None:
+            diagnostics.append(error)
+        return None
+
+
+def analyze_source(text, frontend, profiler=NULL_PROFILER, diagnostics=None, path=None):
+    """
+    Fases 1 a 4 sobre el texto fuente. Retorna la IR, o None si hubo
+    errores (que ya se mostraron). Con un CompileProfiler se mide cada
+    fase; el léxico y el sintáctico se ejecutan entonces por separado.
+    Con una lista diagnostics los errores se agregan también ahí, como
+    Diagnostic del archivo path.
+    """
+    # === FASE 1 y 2: Análisis léxico y sintáctico ===
+    # LÉXICO: El lexer convierte el texto en tokens
+    # Ej: "escena inicio" -> [TOKEN_ESCENA, TOKEN_ID]
+    # SINTÁCTICO: El parser verifica la estructura y crea el AST
+    # Valida que siga las reglas de la gramática. Ante un error se
+    # recupera y sigue, así un solo análisis reporta todos los errores
+    if profiler.enabled:
+        with profiler.phase("lex"):
+            tokens = frontend.tokenize(text)
+        profiler.record(tokens=frontend.token_count(tokens))
+        with profiler.phase("parse"):
+            tree = frontend.parse_tokens(tokens)
+        profiler.record(nodes=frontend.node_count(tree))
+    else:
+        tree = frontend.parse_text(text)  # Árbol de sintaxis abstracta
+    
+    syntax_errors = frontend.syntax_errors(tree)
+    profiler.record(errors=len(syntax_errors))
+    if syntax_errors:
+        print("\nErrores de sintaxis:")
+        for error in syntax_errors:
+            print(f"  {error}")
     
     # === FASE 3: Análisis semántico ===
-    # Verifica que el código tenga sentido:
+    # Verifica que el código tenga sentido (también sobre el árbol
+    # recuperado de errores de sintaxis):
     # - No haya escenas duplicadas
     # - Las referencias ir_a apunten a escenas que existen
-    semantic = SemanticVisitor()
-    semantic.visitProgram(tree)  # Recorre el AST validando
+    with profiler.phase("semantic"):
+        errors = frontend.check(tree)  # Recorre el AST validando
+    profiler.record(errors=len(errors))
     
     # Si hay errores semánticos, los muestra y termina
-    if semantic.errors:
+    if errors:
         print("\nErrores semánticos:")
-        for error in semantic.errors:
+        for error in errors:
             print(f"  {error}")
-        return False
+    if diagnostics is not None:
+        diagnostics.extend(error.in_file(path) for error in syntax_errors + errors)
+    if syntax_errors or errors:
+        return None
     
     print("✓ Sin errores semánticos")
     
     # === FASE 4: Generar código intermedio (IR) ===
     # Convierte el AST en instrucciones simples como:
     # PRINT("texto") y OPTION("texto", destino)
-    ir_gen = IRGenerator()
-    ir_gen.visitProgram(tree)
-    ir = ir_gen.get_ir()  # Obtiene la representación intermedia
+    with profiler.phase("ir"):
+        ir = frontend.build_ir(tree)  # Obtiene la representación intermedia
+    if profiler.enabled:
+        profiler.record(**dict(zip(("scenes", "instructions"), ir_size(ir))))
+    return ir
+
+
+def optimize_ir(ir, opt_level, flat=False, profiler=NULL_PROFILER):
+    """Aplica los pases del nivel -O e imprime cuánto se redujo la IR"""
+    if not opt_level:
+        return ir
+    optimizer = Optimizer(opt_level, flat=flat)
+    with profiler.phase("optimize"):
+        ir = optimizer.run(ir)
+    if profiler.enabled:
+        profiler.record(**dict(zip(("scenes", "instructions"), ir_size(ir))))
+    for line in optimizer.report():
+        print(line)
+    return ir
+
+
+def create_generator(dispatch=False, buffered=False):
+    """Generador de la fase 5 según el modo elegido"""
+    if dispatch:
+        return DispatchCodeGenerator(buffered)
+    return PythonCodeGenerator(buffered)
+
+
+def write_python(python_code, output_file, emit="py"):
+    """Guarda el código generado como .py o como bytecode .pyc"""
+    if emit == "pyc":
+        # Nombre del .py que se habría generado, para las trazas de error
+        write_pyc(python_code, output_file, str(Path(output_file).with_suffix(".py")))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(python_code)
+
+
+def compile_file(input_file, output_file, dispatch=False, frontend=None, cache=None,
+                 emit="py", opt_level=0, buffered=False, profiler=None, diagnostics=None):
+    """
+    Función principal que ejecuta las 5 fases del compilador
+    
+    Con dispatch=True el código se genera como un bucle despachador
+    (pila constante) en lugar de funciones que se llaman entre sí.
+    Si se pasa un frontend (AntlrFrontend o FastFrontend), se reutiliza;
+    si se pasa su nombre ("antlr", "fused", "fast") se crea solo cuando
+    hace falta analizar la fuente. Por defecto se usa ANTLR.
+    Si se pasa un BuildCache y la fuente no cambió desde la última
+    compilación exitosa, se escribe el resultado guardado sin ejecutar
+    ninguna fase.
+    Con emit="ir" la fase 5 se reemplaza por escribir la IR en formato
+    binario .slir, que luego se puede cargar sin repetir las fases 1 a 4.
+    Con emit="pyc" el código Python generado se guarda ya compilado a
+    bytecode, para que al ejecutarlo CPython no tenga que compilarlo.
+    Con opt_level > 0 la IR pasa por el optimizador antes de la fase 5
+    (ver optimizer.OPTIMIZATION_LEVELS).
+    Con buffered=True el programa generado agrupa sus print en una sola
+    escritura por opción.
+    Con un CompileProfiler se mide el tiempo, la memoria pico y el tamaño
+    del resultado de cada fase (ver profiler.CompileProfiler).
+    Con una lista diagnostics los errores de la fuente se agregan ahí.
+    """
+    profiler = profiler or NULL_PROFILER
+    
+    # Verificar que el archivo de entrada existe
+    if not os.path.exists(input_file):
+        report_input_error(f"'{input_file}' no existe", input_file, diagnostics)
+        return False
+    
+    print(f"\nCompilando: {input_file}")
+    
+    source = read_source(input_file, diagnostics)
+    if source is None:
+        return False
+    
+    # Un nombre (o None) se convierte en frontend solo si hay que analizar
+    lazy_frontend = frontend is None or isinstance(frontend, str)
+    frontend_name = (frontend or "antlr") if lazy_frontend else frontend.name
+    if profiler.enabled:
+        profiler.info.update(input_file=input_file, frontend=frontend_name,
+                             opt_level=opt_level, source_bytes=len(source))
+    
+    # Caché: misma fuente + mismo compilador + mismas opciones
+    cache_key = None
+    if cache is not None and emit in ("py", "pyc"):
+        with profiler.phase("cache"):
+            cache_key = cache.key(source, f"dispatch={dispatch};frontend={frontend_name};"
+                                          f"opt={opt_level};buffered={buffered}")
+            cached_code = cache.load(cache_key)
+        profiler.record(hit=cached_code is not None)
+        if cached_code is not None:
+            write_python(cached_code, output_file, emit)
+            # Solo se guardan compilaciones que pasaron el análisis semántico
+            print("✓ Sin errores semánticos (caché)")
+            print(f"✓ Generado (caché): {output_file}\n")
+            return True
+    
+    if lazy_frontend:
+        frontend = create_frontend(frontend_name)
+    
+    text = decode_source(source, input_file, diagnostics)
+    if text is None:
+        return False
+    
+    # === FASES 1 a 4: de la fuente a la IR ===
+    ir = analyze_source(text, frontend, profiler, diagnostics, input_file)
+    if ir is None:
+        return False
+    
+    # === Optimización de la IR (-O) ===
+    ir = optimize_ir(ir, opt_level, flat=(emit == "ir"), profiler=profiler)
+    
+    if emit == "ir":
+        with profiler.phase("codegen"):
+            write_ir(CompactIR.from_ir(ir), output_file)
+        profiler.record(bytes=os.path.getsize(output_file))
+        print(f"✓ IR generada: {output_file}\n")
+        return True
     
     # === FASE 5: Generar código Python ===
     # Traduce las instrucciones IR a funciones Python
     # Cada escena se convierte en una función def
-    py_gen = PythonCodeGenerator()
-    python_code = py_gen.generate(ir)
+    with profiler.phase("codegen"):
+        py_gen = create_generator(dispatch, buffered)
+        python_code = py_gen.generate(ir)
+        
+        # Guardar el archivo de salida (como texto o ya compilado)
+        write_python(python_code, output_file, emit)
+    profiler.record(bytes=os.path.getsize(output_file))
+    
+    if cache_key is not None:
+        cache.store(cache_key, python_code)
+    
+    print(f"✓ Generado: {output_file}\n")
+    return True
+
+
+def is_project(path):
+    """Una carpeta o un manifiesto .json se compila como proyecto"""
+    return os.path.isdir(path) or path.endswith(".json")
+
+
+def compile_project(project_path, output_file, dispatch=False, frontend="antlr", cache_dir=None,
+                    emit="py", opt_level=0, buffered=False, diagnostics=None):
+    """
+    Compila un proyecto de varios archivos (ver project.load_project) a
+    un solo programa. Con cache_dir el índice de símbolos se guarda entre
+    ejecuciones y solo se vuelven a analizar los archivos que cambiaron.
+    Con una lista diagnostics los errores de todos los archivos se
+    agregan ahí.
+    """
+    try:
+        project = load_project(project_path)
+    except ProjectError as e:
+        report_input_error(str(e), project_path, diagnostics)
+        return False
+    
+    print(f"\nCompilando proyecto: {project_path} ({len(project.files)} archivos)")
+    index = ProjectIndex.for_project(cache_dir, project.root, frontend)
+    result = ProjectCompiler(index, frontend).compile(project)
+    index.save()
+    reused = len(project.files) - len(result.parsed)
+    print(f"✓ Índice: {len(result.parsed)} analizados, {reused} sin cambios, "
+          f"{len(result.checked)} revisados")
+    
+    syntax_errors = [(symbols.path, error) for symbols in result.files
+                     for error in symbols.syntax_errors]
+    if syntax_errors:
+        print("\nErrores de sintaxis:")
+        for path, error in syntax_errors:
+            print(f"  {path}: {error}")
+    errors = [(symbols.path, error) for symbols in result.files for error in symbols.errors]
+    if errors:
+        print("\nErrores semánticos:")
+        for path, error in errors:
+            print(f"  {path}: {error}")
+    if diagnostics is not None:
+        diagnostics.extend(result.diagnostics())
+    if not result.success:
+        return False
+    print("✓ Sin errores semánticos")
+    
+    ir = optimize_ir(result.ir, opt_level, flat=(emit == "ir"))
+    if emit == "ir":
+        write_ir(CompactIR.from_ir(ir), output_file)
+        print(f"✓ IR generada: {output_file}\n")
+        return True
+    write_python(create_generator(dispatch, buffered).generate(ir), output_file, emit)
+    print(f"✓ Generado: {output_file}\n")
+    return True
+
+
+def generate_from_ir_file(ir_file, output_file, dispatch=False, opt_level=0, buffered=False,
+                          emit="py", diagnostics=None):
+    """
+    Fase 5 sola: genera el código Python a partir de un archivo .slir
+    escrito con emit="ir", sin volver a analizar la fuente. emit es el
+    mismo de compile_file: con "pyc" se guarda ya compilado a bytecode y
+    con "ir" se vuelve a escribir la IR (por ejemplo, optimizada con -O).
+    Con una lista diagnostics un .slir que no existe o no sirve se agrega ahí.
+    """
+    if not os.path.exists(ir_file):
+        report_input_error(f"'{ir_file}' no existe", ir_file, diagnostics)
+        return False
+    
+    print(f"\nGenerando desde IR: {ir_file}")
+    try:
+        ir = load_ir(ir_file).to_ir()
+    except IRFormatError as e:
+        report_input_error(str(e), ir_file, diagnostics)
+        return False
+    ir = optimize_ir(ir, opt_level, flat=(emit == "ir"))
     
-    # Guardar el archivo de salida
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(python_code)
+    if emit == "ir":
+        write_ir(CompactIR.from_ir(ir), output_file)
+        print(f"✓ IR generada: {output_file}\n")
+        return True
     
+    py_gen = create_generator(dispatch, buffered)
+    write_python(py_gen.generate(ir), output_file, emit)
+    
+    print(f"✓ Generado: {output_file}\n")
+    return True
+
+
+def load_program(input_file, frontend=None, opt_level=0):
+    """
+    CompactIR de una historia: desde una fuente .txt (fases 1 a 4 en
+    memoria) o desde una IR binaria .slir. Retorna None si hubo errores.
+    """
+    if not os.path.exists(input_file):
+        print(f"Error: '{input_file}' no existe")
+        return None
+    
+    if input_file.endswith(".slir"):
+        try:
+            return load_ir(input_file)
+        except IRFormatError as e:
+            print(f"Error: {e}")
+            return None
+    
+    source = read_source(input_file)
+    text = None if source is None else decode_source(source, input_file)
+    if text is None:
+        return None
+    if frontend is None or isinstance(frontend, str):
+        frontend = create_frontend(frontend or "antlr")
+    ir = analyze_source(text, frontend)
+    if ir is None:
+        return None
+    return CompactIR.from_ir(optimize_ir(ir, opt_level, flat=True))
+
+
+def run_story(input_file, dispatch=False, frontend=None, io=None, opt_level=0):
+    """Ejecuta una historia con ScriptVM, sin generar código Python"""
+    program = load_program(input_file, frontend, opt_level)
+    if program is None:
+        return False
+    ScriptVM(program, dispatch=dispatch).run(io)
+    return True
+
+
+def graph_report(input_file, frontend=None):
+    """Imprime la estructura del grafo de escenas: alcance, finales y ciclos"""
+    program = load_program(input_file, frontend)
+    if program is None:
+        return False
+    print(format_graph_report(SceneGraph.from_compact(program).report()))
+    return True
+
+
+def serve_story(input_file, address, dispatch=False, frontend=None, opt_level=0):
+    """
+    Atiende muchas sesiones de la historia en este proceso con asyncio.
+    address es "stdio" o "host:puerto".
+    """
+    # asyncio solo se importa para este modo
+    import asyncio
+    from runtime.SessionServer import SessionServer
+    
+    program = load_program(input_file, frontend, opt_level)
+    if program is None:
+        return False
+    server = SessionServer(program, dispatch=dispatch)
+    try:
+        if address == "stdio":
+            asyncio.run(server.serve_stdio())
+        else:
+            host, _, port = address.rpartition(":")
+            asyncio.run(server.serve_tcp(host or "127.0.0.1", int(port)))
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+def compile_file_streaming(input_file, output_file, dispatch=False, chunk_size=CHUNK_SIZE,
+                           opt_level=0, buffered=False, diagnostics=None):
+    """
+    Compila un archivo muy grande escena por escena.
+    
+    Usa el frontend rápido: lee el archivo por partes, analiza una escena
+    y escribe su función de inmediato. Solo se guardan los nombres de las
+    escenas y las referencias ir_a que aún no se pueden resolver, que se
+    verifican al final; la memoria depende de la escena más grande y no
+    del archivo. La salida se escribe en un archivo temporal que solo
+    reemplaza a output_file si la compilación termina sin errores.
+    De los pases de -O solo se aplica la unión de PRINT, que no necesita
+    ver el programa completo. Se detiene en el primer error de sintaxis.
+    """
+    if diagnostics is None:
+        diagnostics = []
+    if not os.path.exists(input_file):
+        report_input_error(f"'{input_file}' no existe", input_file, diagnostics)
+        return False
+    
+    print(f"\nCompilando (streaming): {input_file}")
+    
+    frontend = FastFrontend()
+    semantic = SemanticChecker()
+    py_gen = create_generator(dispatch, buffered)
+    tmp_file = f"{output_file}.tmp"
+    first_scene = None
+    
+    try:
+        with open(input_file, encoding='utf-8') as src, \
+                open(tmp_file, 'w', encoding='utf-8') as out:
+            out.write("\n".join(py_gen.generate_header()))
+            for scene_name, line, column, instructions, references in frontend.iter_scenes(src.read,
+                                                                                           chunk_size):
+                # FASE 3 incremental: duplicadas ahora, referencias al final
+                semantic.declare_scene(scene_name, line, column)
+                for reference in references:
+                    if not semantic.table.scene_exists(reference[3]):
+                        semantic.scene_references.append(reference)
+                if first_scene is None:
+                    first_scene = scene_name
+                if dispatch:
+                    py_gen.scene_id(scene_name)
+                # FASES 4 y 5: la escena ya está en IR, se emite enseguida
+                if opt_level:
+                    instructions = merge_print_run(instructions)
+                out.write("\n" + "\n".join(py_gen.generate_scene(scene_name, instructions) + [""]))
+            footer = py_gen.generate_footer(first_scene)
+            if footer:
+                out.write("\n" + "\n".join(footer))
+    except FastSyntaxError as e:
+        os.remove(tmp_file)
+        print("\nErrores de sintaxis:")
+        print(f"  {e.diagnostic}")
+        diagnostics.append(e.diagnostic.in_file(input_file))
+        return False
+    except BaseException:
+        # Cualquier otro error (por ejemplo, una fuente que no es UTF-8)
+        # tampoco deja el temporal junto a la salida
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    
+    semantic.check_references()
+    if semantic.errors:
+        os.remove(tmp_file)
+        print("\nErrores semánticos:")
+        for error in semantic.errors:
+            print(f"  {error}")
+        diagnostics.extend(error.in_file(input_file) for error in semantic.errors)
+        return False
+    
+    print("✓ Sin errores semánticos")
+    os.replace(tmp_file, output_file)
     print(f"✓ Generado: {output_file}\n")
     return True
 
 
+# Cada cuánto se revisa si cambió el archivo en --watch (segundos)
+WATCH_INTERVAL = 0.2
+
+
+def watch_file(input_file, output_file, dispatch=False, opt_level=0, buffered=False,
+               interval=WATCH_INTERVAL):
+    """
+    Modo --watch: deja el compilador residente y recompila cada vez que
+    cambia el archivo (revisando su fecha y tamaño cada interval
+    segundos). Solo se vuelven a analizar las escenas editadas (ver
+    IncrementalCompiler) y el archivo de salida se reemplaza solo si la
+    nueva versión no tiene errores. Como en --stream, de los pases de -O
+    solo se aplica la unión de PRINT. Un guardado que no se puede leer
+    (borrado o renombrado a medio camino, o que no es UTF-8) se informa
+    y se sigue observando con la última versión buena.
+    """
+    compiler = IncrementalCompiler(dispatch, buffered, merge_prints=bool(opt_level))
+    print(f"Observando: {input_file} (Ctrl+C para terminar)")
+    last_stamp = None
+    try:
+        while True:
+            try:
+                stat = os.stat(input_file)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = None
+            if stamp is not None and stamp != last_stamp:
+                last_stamp = stamp
+                start = time.perf_counter()
+                source = read_source(input_file)
+                text = None if source is None else decode_source(source, input_file)
+                if text is not None:
+                    result = compiler.update(text)
+                    if result.changed:
+                        report_watch_update(compiler, result, output_file, start)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    return True
+
+
+def report_watch_update(compiler, result, output_file, start):
+    """Escribe la salida si no hubo errores e informa la latencia de la recompilación"""
+    if result.syntax_errors:
+        print("\nErrores de sintaxis:")
+        for error in result.syntax_errors:
+            print(f"  {error}")
+        return
+    if result.errors:
+        print("\nErrores semánticos:")
+        for error in result.errors:
+            print(f"  {error}")
+        return
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(compiler.output())
+    os.replace(tmp_file, output_file)
+    elapsed = (time.perf_counter() - start) * 1000
+    scope = "análisis completo" if result.full else f"{result.reparsed} de {result.scenes} escenas reanalizadas"
+    print(f"✓ Recompilado en {elapsed:.2f} ms ({scope}): {output_file}")
+
+
+# Extensión de salida de cada modo de --emit
+EMIT_SUFFIXES = {"py": ".py", "pyc": ".pyc", "ir": ".slir"}
+
+
+def _compile_one(path, output_dir, dispatch, frontend, cache=None, capture=False, opt_level=0,
+                 buffered=False, emit="py", profile=False):
+    """
+    Compila un archivo del lote y mide su tiempo.
+    
+    Con capture=True la salida de consola (incluidos los errores que
+    ANTLR escribe en stderr) se guarda en el resultado en vez de
+    imprimirse, para poder mostrarla luego en orden.
+    Con profile=True se mide cada fase y el perfil queda en el resultado.
+    Los errores de la fuente quedan en el resultado como Diagnostic.
+    """
+    profiler = CompileProfiler() if profile else None
+    diagnostics = []
+    output_file = os.path.join(output_dir, Path(path).stem + EMIT_SUFFIXES[emit])
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        if capture:
+            stack.enter_context(redirect_stdout(buffer))
+            stack.enter_context(redirect_stderr(buffer))
+        try:
+            success = compile_file(str(path), output_file, dispatch=dispatch,
+                                   frontend=frontend, cache=cache, emit=emit,
+                                   opt_level=opt_level, buffered=buffered, profiler=profiler,
+                                   diagnostics=diagnostics)
+        except Exception as e:
+            # Un archivo roto no debe detener el resto del lote
+            print(f"Error interno compilando '{path}': {e}")
+            success = False
+        if profiler is not None:
+            profiler.close()
+            print(profiler.format_table() + "\n")
+    return CompileResult(str(path), output_file, success, time.perf_counter() - start,
+                         buffer.getvalue(), profiler.to_dict() if profiler else None, diagnostics)
+
+
+# Frontend propio de cada proceso del pool, creado una sola vez
+_worker_frontend = None
+
+
+def _init_worker(frontend_name, dfa_snapshot=None):
+    """Calienta el proceso: importa lexer/parser y deserializa el ATN"""
+    global _worker_frontend
+    use_dfa_snapshot(dfa_snapshot)
+    _worker_frontend = create_frontend(frontend_name)
+
+
+def _compile_in_worker(task):
+    path, output_dir, dispatch, cache, opt_level, buffered, emit, profile = task
+    return _compile_one(path, output_dir, dispatch, _worker_frontend, cache, capture=True,
+                        opt_level=opt_level, buffered=buffered, emit=emit, profile=profile)
+
+
+def compile_many(paths, output_dir="output", dispatch=False, jobs=1, cache=None,
+                 frontend="antlr", opt_level=0, buffered=False, emit="py", profile=False):
+    """
+    Compila varios archivos.
+    
+    Con jobs=1 todo ocurre en este proceso con un único lexer/parser, así
+    que el ATN se deserializa una vez y el caché DFA se aprovecha entre
+    archivos. Con jobs>1 los archivos se reparten en un pool de procesos,
+    cada uno con su propio frontend ya caliente. En ambos casos se retorna
+    un CompileResult por archivo, en el mismo orden de entrada, y la salida
+    de cada archivo se imprime también en ese orden.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [str(p) for p in paths]
+    
+    if jobs <= 1:
+        shared_frontend = create_frontend(frontend)
+        return [_compile_one(path, output_dir, dispatch, shared_frontend, cache,
+                             opt_level=opt_level, buffered=buffered, emit=emit, profile=profile)
+                for path in paths]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    tasks = [(path, output_dir, dispatch, cache, opt_level, buffered, emit, profile)
+             for path in paths]
+    # Lotes grandes por tarea para no pagar un viaje al pool por archivo
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(frontend, dfa_snapshot_path())) as pool:
+        # map conserva el orden de entrada aunque los procesos terminen
+        # en otro orden
+        for result in pool.map(_compile_in_worker, tasks, chunksize=chunksize):
+            print(result.log, end="")
+            results.append(result)
+    return results
+
+
+def print_timing_summary(results):
+    """Imprime una tabla con el tiempo de compilación de cada archivo"""
+    width = max([len(r.input_file) for r in results] + [7])
+    print(f"{'Archivo'.ljust(width)}  Estado  Tiempo (ms)")
+    print(f"{'-' * width}  ------  -----------")
+    for r in results:
+        status = "ok" if r.success else "error"
+        print(f"{r.input_file.ljust(width)}  {status.ljust(6)}  {r.seconds * 1000:11.2f}")
+    total = sum(r.seconds for r in results)
+    ok = sum(1 for r in results if r.success)
+    print(f"\n{ok}/{len(results)} compilados en {total * 1000:.2f} ms")
+
+
+def build_arg_parser():
+    """Define los argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Compilador ScriptLang -> Python",
+        usage="python main.py <entrada.txt> [salida.py] [opciones]",
+        epilog=f"Código de salida: {EXIT_OK} si todo compiló, {EXIT_ERRORS} si hubo errores "
+               f"(en --batch, si algún archivo los tuvo), {EXIT_USAGE} si los argumentos "
+               "no son válidos.",
+    )
+    parser.add_argument("input_file", nargs="?",
+                        help="archivo fuente .txt, o un proyecto: carpeta o manifiesto .json")
+    # Archivo de salida (opcional, por defecto output.py)
+    parser.add_argument("output_file", nargs="?", default="output.py",
+                        help="archivo Python generado (por defecto output.py)")
+    parser.add_argument("--dispatch", action="store_true",
+                        help="genera un bucle despachador en vez de llamadas "
+                             "recursivas entre escenas (pila constante)")
+    parser.add_argument("--frontend", choices=["antlr", "fused", "fast"], default="antlr",
+                        help="antlr (por defecto); fused: ANTLR con semántica e IR "
+                             "en un solo recorrido; fast: lexer/parser escrito a "
+                             "mano, más rápido")
+    parser.add_argument("--emit", choices=["py", "pyc", "ir"], default="py",
+                        help="py: código Python (por defecto); pyc: código Python ya "
+                             "compilado a bytecode; ir: IR binaria .slir. "
+                             "Una entrada .slir se traduce sin volver a analizarla. "
+                             "--stream y --watch solo generan py")
+    parser.add_argument("-O", dest="opt_level", type=int, choices=[0, 1, 2], default=0,
+                        help="optimización de la IR: 1 quita escenas inalcanzables y une "
+                             "PRINT seguidos, 2 además incrusta escenas con una sola "
+                             "referencia (por defecto 0)")
+    parser.add_argument("--buffered", action="store_true",
+                        help="el programa generado escribe los textos seguidos de una vez "
+                             "y usa stdout con búfer")
+    parser.add_argument("--run", action="store_true",
+                        help="ejecuta la historia directamente con la VM, sin "
+                             "generar código (acepta .txt o .slir)")
+    parser.add_argument("--graph-report", action="store_true",
+                        help="analiza el grafo de escenas: inalcanzables, finales y ciclos")
+    parser.add_argument("--serve", metavar="DIRECCION",
+                        help="atiende muchas sesiones de la historia con la VM: "
+                             "'host:puerto' (TCP) o 'stdio' (líneas '<id> <respuesta>')")
+    parser.add_argument("--stream", action="store_true",
+                        help="compila escena por escena con el frontend rápido, "
+                             "para archivos muy grandes (no usa el caché)")
+    parser.add_argument("--watch", action="store_true",
+                        help="deja el compilador residente y recompila al guardar, "
+                             "reanalizando solo las escenas editadas (frontend rápido)")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="compila todos los .txt de DIR en un solo proceso")
+    parser.add_argument("--out-dir", default="output",
+                        help="carpeta de salida para --batch (por defecto output)")
+    parser.add_argument("--bundle", metavar="ARCHIVO.pyz",
+                        help="con --batch: empaqueta las historias compiladas a .pyc "
+                             "en un zipapp (python ARCHIVO.pyz <historia>)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignora el caché de compilación y recompila todo")
+    parser.add_argument("--cache-dir", default=".scriptlang_cache",
+                        help="carpeta del caché de compilación")
+    parser.add_argument("--cache-max-mb", type=int, default=64,
+                        help="tamaño máximo del caché en MB (por defecto 64)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="procesos en paralelo para --batch (por defecto 1)")
+    parser.add_argument("--dfa-cache", nargs="?", const="", metavar="ARCHIVO",
+                        help="restaura el ATN/DFA de ANTLR guardado por una ejecución "
+                             "anterior y guarda el actualizado al terminar (por defecto "
+                             "CACHE_DIR/antlr_dfa.pickle). Para crearlo, compilar un "
+                             "lote representativo con -j 1")
+    parser.add_argument("--profile", action="store_true",
+                        help="mide tiempo, memoria pico (tracemalloc) y tamaño del "
+                             "resultado de cada fase (compilación normal y --batch)")
+    parser.add_argument("--profile-json", metavar="ARCHIVO",
+                        help="como --profile, y guarda las mediciones en ARCHIVO (JSON)")
+    parser.add_argument("--diagnostics", metavar="ARCHIVO",
+                        help="guarda los errores de la compilación (normal, desde .slir, --stream, "
+                             "--batch o proyecto) en ARCHIVO, con código, archivo, "
+                             "línea, columna y tramo; queda vacío si no hubo errores")
+    parser.add_argument("--diagnostics-format", choices=DIAGNOSTIC_FORMATS, default="jsonl",
+                        help="formato de --diagnostics: jsonl, un objeto JSON por error "
+                             "(por defecto), o sarif (SARIF 2.1.0)")
+    return parser
+
+
+def main(argv=None):
+    """
+    Ejecuta el compilador con los argumentos de consola (o argv) y
+    retorna el código de salida (EXIT_OK, EXIT_ERRORS o EXIT_USAGE).
+    run_tests.py lo llama en su propio proceso en vez de lanzar
+    python main.py por cada prueba.
+    """
+    arg_parser = build_arg_parser()
+    args = arg_parser.parse_args(argv)
+    if args.emit != "py" and (args.stream or args.watch):
+        # Los dos escriben el código Python a medida que lo generan
+        arg_parser.error(f"--emit {args.emit} no se puede usar con --stream ni --watch")
+    cache = None if args.no_cache else BuildCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    profile = args.profile or args.profile_json is not None
+    if args.dfa_cache is not None:
+        use_dfa_snapshot(args.dfa_cache or os.path.join(args.cache_dir, "antlr_dfa.pickle"))
+    diagnostics = []
+    if args.batch and not os.path.isdir(args.batch):
+        report_input_error(f"'{args.batch}' no existe o no es una carpeta", args.batch, diagnostics)
+        if args.diagnostics:
+            write_diagnostics(diagnostics, args.diagnostics, args.diagnostics_format)
+        return EXIT_USAGE
+    if args.batch:
+        # Modo lote: todos los archivos del directorio en este proceso
+        paths = sorted(Path(args.batch).glob("*.txt"))
+        if not paths:
+            # Un lote vacío no es una compilación exitosa
+            report_input_error(f"'{args.batch}' no tiene archivos .txt", args.batch, diagnostics)
+            success = False
+        else:
+            # El zipapp guarda bytecode, así que --bundle implica --emit pyc
+            emit = "pyc" if args.bundle else args.emit
+            results = compile_many(paths, args.out_dir, dispatch=args.dispatch,
+                                   jobs=args.jobs, cache=cache, frontend=args.frontend,
+                                   opt_level=args.opt_level, buffered=args.buffered, emit=emit,
+                                   profile=profile)
+            print_timing_summary(results)
+            if args.profile_json:
+                write_profiles([r.profile for r in results], args.profile_json)
+            if args.bundle:
+                names = write_bundle([r.output_file for r in results if r.success], args.bundle)
+                print(f"✓ Zipapp generado: {args.bundle} ({len(names)} historias)")
+            success = all(r.success for r in results)
+            diagnostics = [d for r in results for d in r.diagnostics]
+    elif args.input_file and args.graph_report:
+        success = graph_report(args.input_file, frontend=args.frontend)
+    elif args.input_file and args.serve:
+        success = serve_story(args.input_file, args.serve, dispatch=args.dispatch,
+                              frontend=args.frontend, opt_level=args.opt_level)
+    elif args.input_file and args.run:
+        success = run_story(args.input_file, dispatch=args.dispatch,
+                            frontend=args.frontend, opt_level=args.opt_level)
+    elif args.input_file and args.input_file.endswith(".slir"):
+        success = generate_from_ir_file(args.input_file, args.output_file, dispatch=args.dispatch,
+                                        opt_level=args.opt_level, buffered=args.buffered,
+                                        emit=args.emit, diagnostics=diagnostics)
+    elif args.input_file and args.watch:
+        success = watch_file(args.input_file, args.output_file, dispatch=args.dispatch,
+                             opt_level=args.opt_level, buffered=args.buffered)
+    elif args.input_file and is_project(args.input_file):
+        success = compile_project(args.input_file, args.output_file, dispatch=args.dispatch,
+                                  frontend=args.frontend,
+                                  cache_dir=None if args.no_cache else args.cache_dir,
+                                  emit=args.emit, opt_level=args.opt_level,
+                                  buffered=args.buffered, diagnostics=diagnostics)
+    elif args.input_file and args.stream:
+        success = compile_file_streaming(args.input_file, args.output_file, dispatch=args.dispatch,
+                                         opt_level=args.opt_level, buffered=args.buffered,
+                                         diagnostics=diagnostics)
+    elif args.input_file:
+        # Ejecutar el compilador
+        profiler = CompileProfiler() if profile else None
+        success = compile_file(args.input_file, args.output_file, dispatch=args.dispatch,
+                               frontend=args.frontend, cache=cache, emit=args.emit,
+                               opt_level=args.opt_level, buffered=args.buffered,
+                               profiler=profiler, diagnostics=diagnostics)
+        if profiler is not None:
+            profiler.close()
+            print(profiler.format_table())
+            if args.profile_json:
+                write_profiles([profiler.to_dict()], args.profile_json)
+    else:
+        arg_parser.print_usage()
+        return EXIT_USAGE
+    if args.diagnostics:
+        write_diagnostics(diagnostics, args.diagnostics, args.diagnostics_format)
+    if cache is not None:
+        cache.evict()
+    if save_dfa_snapshot():
+        print(f"✓ Instantánea DFA guardada: {dfa_snapshot_path()}")
+    return EXIT_OK if success else EXIT_ERRORS
+
+
 # Punto de entrada del programa
 if __name__ == "__main__":
-    # Verificar que se pasaron argumentos
-    if len(sys.argv) < 2:
-        print("Uso: python main.py <entrada.txt> [salida.py]")
-    else:
-        # Obtener archivo de entrada (obligatorio)
-        input_file = sys.argv[1]
-        # Archivo de salida (opcional, por defecto output.py)
-        output_file = sys.argv[2] if len(sys.argv) > 2 else "output.py"
-        # Ejecutar el compilador
-        compile_file(input_file, output_file)
\ No newline at end of file
+    sys.exit(main())
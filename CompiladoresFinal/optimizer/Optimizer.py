@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from typing import Dict, List, Any
+from code_generator.IRInstruction import IRInstruction
+from semantic_analyzer.SceneGraph import SceneGraph
+
+# Profundidad máxima de escenas incrustadas una dentro de otra: cada una
+# agrega un bloque if y Python no admite más de 20 bloques anidados
+MAX_INLINE_DEPTH = 8
+
+
+def count_instructions(instructions: List[IRInstruction]) -> int:
+    """Cuenta las instrucciones, incluidas las de las escenas incrustadas"""
+    total = 0
+    for inst in instructions:
+        total += 1
+        if inst.op == "BRANCH":
+            total += count_instructions(inst.arg2[1])
+    return total
+
+
+def ir_size(ir: Dict[str, Any]):
+    """Retorna (escenas, instrucciones) de la IR"""
+    scenes = ir.get("scenes", {})
+    return len(scenes), sum(count_instructions(insts) for insts in scenes.values())
+
+
+def remove_dead_scenes(ir: Dict[str, Any]) -> Dict[str, Any]:
+    """Elimina las escenas que no se alcanzan desde la primera"""
+    scenes = ir.get("scenes", {})
+    if ir.get("first_scene") is None:
+        return ir
+    graph = SceneGraph.from_ir(ir)
+    reachable = graph.reachable()
+    live = {
+        name: instructions
+        for scene_id, (name, instructions) in enumerate(scenes.items())
+        if reachable[scene_id]
+    }
+    return {**ir, "scenes": live}
+
+
+def inline_scenes(ir: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Incrusta cada escena que solo se menciona en una opción dentro de esa
+    opción, como una instrucción BRANCH(texto, (escena, instrucciones)),
+    y la quita de la lista de escenas. El generador la emite dentro del
+    if de la opción, así que elegirla ya no cuesta una llamada (o una
+    vuelta del despachador). La primera escena nunca se incrusta.
+    """
+    scenes = ir.get("scenes", {})
+    first_scene = ir.get("first_scene")
+    
+    references: Dict[str, int] = {}
+    for instructions in scenes.values():
+        for inst in instructions:
+            if inst.op == "OPTION":
+                references[inst.arg2] = references.get(inst.arg2, 0) + 1
+    candidates = {
+        name for name, count in references.items()
+        if count == 1 and name != first_scene and name in scenes
+    }
+    
+    # Cada escena se ubica una sola vez: como función o incrustada
+    placed = set()
+    
+    def expand(instructions, depth):
+        result = []
+        for inst in instructions:
+            target = inst.arg2
+            if (inst.op == "OPTION" and target in candidates and target not in placed
+                    and depth < MAX_INLINE_DEPTH):
+                placed.add(target)
+                body = expand(scenes[target], depth + 1)
+                result.append(IRInstruction("BRANCH", inst.arg1, (target, body)))
+            else:
+                result.append(inst)
+        return result
+    
+    expanded = {}
+    roots = [name for name in scenes if name not in candidates]
+    roots += [name for name in scenes if name in candidates]
+    for name in roots:
+        if name not in placed:
+            placed.add(name)
+            expanded[name] = expand(scenes[name], 0)
+    # Las escenas que quedaron como función conservan su orden original
+    live = {name: expanded[name] for name in scenes if name in expanded}
+    return {**ir, "scenes": live}
+
+
+def merge_print_run(instructions: List[IRInstruction]) -> List[IRInstruction]:
+    """Une cada serie de PRINT consecutivos en un solo PRINT de varias líneas"""
+    result = []
+    for inst in instructions:
+        if inst.op == "PRINT" and result and result[-1].op == "PRINT":
+            result[-1] = IRInstruction("PRINT", f"{result[-1].arg1}\n{inst.arg1}")
+        elif inst.op == "BRANCH":
+            target, body = inst.arg2
+            result.append(IRInstruction("BRANCH", inst.arg1, (target, merge_print_run(body))))
+        else:
+            result.append(inst)
+    return result
+
+
+def merge_prints(ir: Dict[str, Any]) -> Dict[str, Any]:
+    scenes = {name: merge_print_run(insts) for name, insts in ir.get("scenes", {}).items()}
+    return {**ir, "scenes": scenes}
+
+
+PASSES = {
+    "dead_scenes": remove_dead_scenes,
+    "inline_scenes": inline_scenes,
+    "merge_prints": merge_prints,
+}
+
+# Pases de cada nivel -O, en orden. inline_scenes produce BRANCH, que
+# solo entienden los generadores de Python (no CompactIR ni la VM).
+OPTIMIZATION_LEVELS = {
+    0: (),
+    1: ("dead_scenes", "merge_prints"),
+    2: ("dead_scenes", "inline_scenes", "merge_prints"),
+}
+
+
+@dataclass
+class PassStats:
+    name: str
+    scenes_before: int
+    scenes_after: int
+    instructions_before: int
+    instructions_after: int
+
+
+class Optimizer:
+    """
+    Ejecuta los pases de un nivel -O sobre la IR de IRGenerator (sin
+    modificarla) y guarda el tamaño antes y después de cada uno.
+    Con flat=True se omite inline_scenes, para las salidas que usan
+    CompactIR (.slir, --run, --serve).
+    """
+    def __init__(self, level: int = 1, flat: bool = False):
+        self.level = level
+        self.passes = [
+            name for name in OPTIMIZATION_LEVELS[level]
+            if not (flat and name == "inline_scenes")
+        ]
+        self.stats: List[PassStats] = []
+    
+    def run(self, ir: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats = []
+        for name in self.passes:
+            before = ir_size(ir)
+            ir = PASSES[name](ir)
+            after = ir_size(ir)
+            self.stats.append(PassStats(name, before[0], after[0], before[1], after[1]))
+        return ir
+    
+    def report(self) -> List[str]:
+        if not self.stats:
+            return []
+        first, last = self.stats[0], self.stats[-1]
+        lines = [
+            f"✓ Optimización -O{self.level}: escenas {first.scenes_before} -> {last.scenes_after}, "
+            f"instrucciones {first.instructions_before} -> {last.instructions_after}"
+        ]
+        for s in self.stats:
+            lines.append(f"    {s.name}: escenas {s.scenes_before} -> {s.scenes_after}, "
+                         f"instrucciones {s.instructions_before} -> {s.instructions_after}")
+        return lines
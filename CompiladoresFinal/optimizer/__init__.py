@@ -0,0 +1 @@
+from .Optimizer import Optimizer, OPTIMIZATION_LEVELS, MAX_INLINE_DEPTH
@@ -1,13 +0,0 @@
-# Guión interactivo generado
-
-def inicio():
-    print("Hola")
-    opcion = input("Ir -> ")
-    if opcion.strip():
-        fin()
-
-def fin():
-    print("Fin")
-
-if __name__ == '__main__':
-    inicio()
\ No newline at end of file
@@ -1 +0,0 @@
-# Guión interactivo generado
@@ -1,7 +0,0 @@
-# Guión interactivo generado
-
-def <missing ID>():
-    print("Sin nombre")
-
-if __name__ == '__main__':
-    <missing ID>()
\ No newline at end of file
@@ -1,7 +0,0 @@
-# Guión interactivo generado
-
-def inicio():
-    print("missing STRING")
-
-if __name__ == '__main__':
-    inicio()
\ No newline at end of file
@@ -0,0 +1,142 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Nombre de cada fase en el reporte legible. Las claves (en inglés) son
+# las del JSON, para que no cambien si cambia el texto del reporte.
+PHASE_LABELS = {
+    "cache": "caché",
+    "lex": "léxico",
+    "parse": "sintáctico",
+    "semantic": "semántico",
+    "ir": "IR",
+    "optimize": "optimización",
+    "codegen": "generación",
+}
+
+METRIC_LABELS = {
+    "hit": "acierto",
+    "tokens": "tokens",
+    "nodes": "nodos",
+    "errors": "errores",
+    "scenes": "escenas",
+    "instructions": "instrucciones",
+    "bytes": "bytes",
+}
+
+# Versión del formato JSON de --profile-json
+PROFILE_FORMAT = 1
+
+
+@dataclass
+class PhaseStats:
+    name: str
+    seconds: float
+    # Memoria asignada por encima de la que había al empezar la fase
+    peak_bytes: Optional[int] = None
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+class CompileProfiler:
+    """
+    Mide cada fase de una compilación: tiempo de pared, memoria pico
+    (con tracemalloc) y el tamaño de lo que produjo (tokens, nodos del
+    árbol, IR, bytes generados). compile_file llama a phase() alrededor
+    de cada fase y a record() para anotar el tamaño del resultado, fuera
+    del tiempo medido.
+    
+    tracemalloc hace más lentas las fases que asignan mucha memoria; con
+    memory=False solo se mide el tiempo.
+    """
+    enabled = True
+    
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.phases: List[PhaseStats] = []
+        self.info: Dict[str, Any] = {}
+        self._started_tracing = False
+    
+    @contextmanager
+    def phase(self, name: str):
+        base = 0
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] - base if self.memory else None
+            self.phases.append(PhaseStats(name, seconds, peak))
+    
+    def record(self, **metrics):
+        """Anota métricas en la última fase medida"""
+        if self.phases:
+            self.phases[-1].metrics.update(metrics)
+    
+    def close(self):
+        """Detiene tracemalloc si lo inició este perfilador"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    @property
+    def total_seconds(self) -> float:
+        return sum(p.seconds for p in self.phases)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        peaks = [p.peak_bytes for p in self.phases if p.peak_bytes is not None]
+        return {
+            **self.info,
+            "total_seconds": self.total_seconds,
+            "peak_bytes": max(peaks) if peaks else None,
+            "phases": [asdict(p) for p in self.phases],
+        }
+    
+    def format_table(self) -> str:
+        lines = [
+            f"Perfil: {self.info.get('input_file', '-')}",
+            f"  {'Fase':<14}{'Tiempo (ms)':>12}{'Memoria (KB)':>14}  Tamaño",
+        ]
+        for p in self.phases:
+            memory = f"{p.peak_bytes / 1024:14.1f}" if p.peak_bytes is not None else f"{'-':>14}"
+            size = ", ".join(format_metric(k, v) for k, v in p.metrics.items()) or "-"
+            lines.append(f"  {PHASE_LABELS.get(p.name, p.name):<14}"
+                         f"{p.seconds * 1000:12.2f}{memory}  {size}")
+        lines.append(f"  {'total':<14}{self.total_seconds * 1000:12.2f}")
+        return "\n".join(lines)
+
+
+class NullProfiler:
+    """Perfilador que no mide nada: el valor por defecto de compile_file"""
+    enabled = False
+    
+    def phase(self, name: str):
+        return nullcontext()
+    
+    def record(self, **metrics):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def format_metric(name: str, value) -> str:
+    label = METRIC_LABELS.get(name, name)
+    if isinstance(value, bool):
+        return f"{label}: {'sí' if value else 'no'}"
+    return f"{value} {label}"
+
+
+def write_profiles(profiles: List[Dict[str, Any]], path: str):
+    """Guarda los perfiles de una ejecución como JSON (uno por archivo)"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"format": PROFILE_FORMAT, "profiles": profiles}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
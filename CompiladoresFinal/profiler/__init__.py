@@ -0,0 +1 @@
+from .CompileProfiler import CompileProfiler, NullProfiler, NULL_PROFILER, PhaseStats, write_profiles
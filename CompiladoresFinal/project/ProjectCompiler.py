@@ -0,0 +1,197 @@
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from diagnostics.Diagnostic import Diagnostic, DUPLICATE_SCENE, decode_error
+from frontend import create_frontend
+from semantic_analyzer.NameIndex import NameIndex
+from semantic_analyzer.SemanticChecker import SemanticChecker
+from .ProjectIndex import FileSymbols, ProjectIndex, source_digest
+
+# Manifiesto opcional en la carpeta del proyecto
+MANIFEST_NAME = "scriptlang.json"
+
+
+class ProjectError(Exception):
+    pass
+
+
+@dataclass
+class Project:
+    root: str
+    # Archivos en orden; el orden decide cuál declaración de una escena
+    # duplicada es la válida
+    files: List[str]
+    entry: str
+
+
+def load_project(path: str) -> Project:
+    """
+    Un proyecto es una carpeta o un manifiesto. En una carpeta sin
+    manifiesto entran todos sus .txt (también los de subcarpetas) en
+    orden alfabético y la historia empieza en el primero. El manifiesto
+    (scriptlang.json) fija los archivos y el de inicio:
+    
+        {"archivos": ["inicio.txt", "capitulos/cap1.txt"], "inicio": "inicio.txt"}
+    
+    Todas las escenas comparten un solo espacio de nombres: ir_a puede
+    apuntar a una escena de cualquier archivo del proyecto.
+    """
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        path = os.path.join(path, MANIFEST_NAME)
+    if os.path.isdir(path):
+        root = path
+        files = sorted(str(p) for p in Path(root).rglob("*.txt"))
+        if not files:
+            raise ProjectError(f"'{root}' no tiene archivos .txt")
+        return Project(root, files, files[0])
+    
+    root = os.path.dirname(path) or "."
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ProjectError(f"no se pudo leer el manifiesto '{path}': {e}")
+    names = manifest.get("archivos") if isinstance(manifest, dict) else None
+    if not names or not all(isinstance(name, str) for name in names):
+        raise ProjectError(f"'{path}' debe tener una lista \"archivos\"")
+    files = [os.path.join(root, name) for name in names]
+    entry = os.path.join(root, manifest.get("inicio", names[0]))
+    for file in files:
+        if not os.path.isfile(file):
+            raise ProjectError(f"'{file}' no existe")
+    if entry not in files:
+        raise ProjectError(f"el archivo de inicio '{entry}' no está en \"archivos\"")
+    return Project(root, files, entry)
+
+
+@dataclass
+class ProjectResult:
+    files: List[FileSymbols]
+    # Archivos que se volvieron a analizar y archivos cuya semántica se revisó
+    parsed: List[str]
+    checked: List[str]
+    ir: Optional[dict] = None
+    
+    @property
+    def success(self) -> bool:
+        return all(not f.syntax_errors and not f.errors for f in self.files)
+    
+    def diagnostics(self) -> List[Diagnostic]:
+        """Errores de sintaxis y luego semánticos, cada uno con su archivo"""
+        return ([error.in_file(f.path) for f in self.files for error in f.syntax_errors]
+                + [error.in_file(f.path) for f in self.files for error in f.errors])
+
+
+def declared_names(symbols: Optional[FileSymbols]) -> Set[str]:
+    return {name for name, _, _ in symbols.scenes} if symbols else set()
+
+
+class ProjectCompiler:
+    """
+    Fases 1 a 4 de un proyecto de varios archivos con el índice de
+    símbolos: solo se analizan los archivos que cambiaron desde la última
+    compilación, y solo se revisan ellos y sus dependientes (los que
+    mencionan o declaran una escena cuya declaración cambió, y si cambió
+    alguna, los que tienen referencias rotas, por sus sugerencias). El
+    resto conserva su IR y sus errores del índice.
+    """
+    def __init__(self, index: ProjectIndex, frontend: str = "antlr"):
+        self.index = index
+        self.frontend_name = frontend
+        self._frontend = None
+        # Índice de las escenas del proyecto para las sugerencias; se arma
+        # solo si alguna referencia no se resuelve
+        self._scene_index: Optional[NameIndex] = None
+    
+    @property
+    def frontend(self):
+        # Se crea solo si algún archivo cambió
+        if self._frontend is None:
+            self._frontend = create_frontend(self.frontend_name)
+        return self._frontend
+    
+    def parse_file(self, path: str, source: bytes, digest: str) -> FileSymbols:
+        symbols = FileSymbols(path, digest)
+        try:
+            text = source.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # Queda como un archivo sin escenas que no compila
+            symbols.syntax_errors = [decode_error(source, e, path)]
+            return symbols
+        tree = self.frontend.parse_text(text)
+        symbols.syntax_errors = self.frontend.syntax_errors(tree)
+        # Con errores de sintaxis las escenas recuperadas igual se declaran,
+        # pero la IR no se construye
+        symbols.scenes, symbols.references = self.frontend.symbols(tree)
+        if not symbols.syntax_errors:
+            symbols.ir_scenes = self.frontend.build_ir(tree)["scenes"]
+        return symbols
+    
+    def compile(self, project: Project) -> ProjectResult:
+        old = self.index.files
+        files: Dict[str, FileSymbols] = {}
+        parsed = []
+        for path in project.files:
+            with open(path, "rb") as f:
+                source = f.read()
+            digest = source_digest(source)
+            symbols = old.get(path)
+            if symbols is None or symbols.digest != digest:
+                symbols = self.parse_file(path, source, digest)
+                parsed.append(path)
+            files[path] = symbols
+        
+        # Escenas que aparecieron o desaparecieron en algún archivo
+        changed_names = set()
+        for path in set(old) | set(files):
+            if old.get(path) is not files.get(path):
+                changed_names |= declared_names(old.get(path)) ^ declared_names(files.get(path))
+        
+        # Primera declaración de cada escena, en el orden del proyecto
+        owner: Dict[str, Tuple[str, int, int]] = {}
+        for path, symbols in files.items():
+            for name, line, column in symbols.scenes:
+                owner.setdefault(name, (path, line, column))
+        self._scene_index = None
+        
+        reordered = [p for p in files if p in old] != [p for p in old if p in files]
+        checked = []
+        for path, symbols in files.items():
+            targets = {target for _, _, _, target in symbols.references}
+            depends = changed_names & (targets | declared_names(symbols))
+            # La sugerencia de una referencia rota depende de todas las
+            # escenas del proyecto, no solo de la que falta
+            stale_suggestions = changed_names and not targets <= owner.keys()
+            if reordered or path in parsed or depends or stale_suggestions:
+                symbols.errors = self.check_file(symbols, owner)
+                checked.append(path)
+        
+        self.index.files = files
+        result = ProjectResult(list(files.values()), parsed, checked)
+        if result.success:
+            scenes = {}
+            for symbols in files.values():
+                scenes.update(symbols.ir_scenes)
+            entry = files[project.entry].scenes
+            result.ir = {"scenes": scenes, "first_scene": entry[0][0] if entry else None}
+        return result
+    
+    def check_file(self, symbols: FileSymbols,
+                   owner: Dict[str, Tuple[str, int, int]]) -> List[Diagnostic]:
+        """Escenas duplicadas y referencias ir_a contra todo el proyecto"""
+        semantic = SemanticChecker()
+        for name, line, column in symbols.scenes:
+            first_path = owner[name][0]
+            if owner[name] != (symbols.path, line, column):
+                where = "" if first_path == symbols.path else f" (ya declarada en {first_path})"
+                semantic.error_at(DUPLICATE_SCENE, line, column, name,
+                                  f"Escena '{name}' duplicada{where}")
+        for _, line, column, target in symbols.references:
+            if target not in owner:
+                if self._scene_index is None:
+                    self._scene_index = NameIndex(owner)
+                semantic.unknown_scene(line, column, target, self._scene_index.closest(target))
+        return semantic.errors
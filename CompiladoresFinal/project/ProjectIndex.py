@@ -0,0 +1,75 @@
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from build_cache.BuildCache import compiler_fingerprint
+from code_generator.IRInstruction import IRInstruction
+from diagnostics.Diagnostic import Diagnostic
+
+# Subir esta versión invalida los índices guardados
+INDEX_FORMAT = 3
+
+
+@dataclass
+class FileSymbols:
+    """
+    Lo que el índice sabe de un archivo del proyecto sin volver a
+    analizarlo: su huella, sus escenas, sus referencias ir_a, su IR, sus
+    errores de sintaxis y los errores de la última revisión.
+    """
+    path: str
+    digest: str
+    scenes: List[Tuple[str, int, int]] = field(default_factory=list)
+    references: List[Tuple[str, int, int, str]] = field(default_factory=list)
+    ir_scenes: Dict[str, List[IRInstruction]] = field(default_factory=dict)
+    syntax_errors: List[Diagnostic] = field(default_factory=list)
+    errors: List[Diagnostic] = field(default_factory=list)
+
+
+def source_digest(source: bytes) -> str:
+    return hashlib.sha256(source).hexdigest()
+
+
+class ProjectIndex:
+    """
+    Índice de símbolos de un proyecto, guardado entre ejecuciones en la
+    carpeta del caché (un archivo por proyecto y frontend). Se descarta
+    entero si cambia el compilador.
+    """
+    def __init__(self, path: Optional[str] = None, frontend: str = "antlr"):
+        self.path = path
+        self.key = f"{INDEX_FORMAT};{compiler_fingerprint()};{frontend}"
+        # Archivos en el orden del proyecto
+        self.files: Dict[str, FileSymbols] = {}
+    
+    @classmethod
+    def for_project(cls, cache_dir: Optional[str], project_root: str, frontend: str = "antlr"):
+        """Índice del proyecto en cache_dir (sin cache_dir solo vive en memoria)"""
+        if cache_dir is None:
+            return cls(None, frontend)
+        name = hashlib.sha256(os.path.abspath(project_root).encode()).hexdigest()[:16]
+        index = cls(os.path.join(cache_dir, "proyectos", f"{name}-{frontend}.idx"), frontend)
+        index.load()
+        return index
+    
+    def load(self):
+        """Carga el índice guardado; si no existe o no sirve, queda vacío"""
+        try:
+            with open(self.path, "rb") as f:
+                key, files = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            return
+        if key == self.key:
+            self.files = files
+    
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Escritura atómica, igual que BuildCache.store
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((self.key, self.files), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,2 @@
+from .ProjectIndex import FileSymbols, ProjectIndex
+from .ProjectCompiler import MANIFEST_NAME, Project, ProjectCompiler, ProjectError, load_project
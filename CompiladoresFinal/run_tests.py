@@ -2,12 +2,23 @@
 """
 Script de automatización de pruebas para el compilador ScriptLang
 Ejecuta todos los casos de prueba válidos e inválidos automáticamente
+
+El compilador y los scripts generados se ejecutan dentro de este mismo
+proceso (sin lanzar un intérprete nuevo por prueba), y las pruebas se
+reparten entre varios procesos con -j.
 """
+import argparse
+import io   # Para capturar la salida del compilador y de los scripts
 import os
+import signal  # Para el tiempo máximo de cada prueba
 import sys
-import subprocess  # Para ejecutar comandos de consola
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
 from pathlib import Path  # Para manejar rutas de archivos
 
+import main as compiler  # El compilador, para llamarlo sin subprocess
+
 
 # Clase para dar colores a la salida en consola
 class Colors:
@@ -32,41 +43,91 @@ def print_test(name, status, message=""):
     print(f"{status_symbol} {name}: {message}")
 
 
+@contextmanager
+def time_limit(seconds):
+    """Lanza TimeoutError si el bloque tarda más de seconds (solo en Unix)"""
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+    
+    def on_timeout(signum, frame):
+        raise TimeoutError()
+    
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def exit_code(e: SystemExit):
+    """Código con el que terminaría el intérprete por un sys.exit()"""
+    if e.code is None:
+        return 0
+    return e.code if isinstance(e.code, int) else 1
+
+
 def run_compiler(input_file, output_file):
-    """Ejecuta el compilador main.py y retorna si fue exitoso"""
+    """Ejecuta el compilador (main.main) y retorna si fue exitoso"""
+    stdout, stderr = io.StringIO(), io.StringIO()
     try:
-        # Ejecuta: python main.py entrada.txt salida.py
-        result = subprocess.run(
-            ['python', 'main.py', input_file, output_file],
-            capture_output=True,
-            text=True,
-            timeout=10  # Máximo 10 segundos
-        )
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "", "Timeout"
-    except Exception as e:
-        return False, "", str(e)
+        # Equivale a: python main.py entrada.txt salida.py --no-cache (cada
+        # prueba ejecuta el compilador de verdad, no una salida guardada)
+        with redirect_stdout(stdout), redirect_stderr(stderr), time_limit(10):  # Máximo 10 segundos
+            code = compiler.main([input_file, output_file, "--no-cache"])
+    except TimeoutError:
+        return False, stdout.getvalue(), "Timeout"
+    except SystemExit as e:
+        code = exit_code(e)
+    except Exception:
+        # Como el intérprete ante una excepción no capturada: traza y código 1
+        stderr.write(traceback.format_exc())
+        code = 1
+    return code == 0, stdout.getvalue(), stderr.getvalue()
 
 
 def run_generated_script(script_file):
     """Ejecuta el script Python generado para verificar que funciona"""
+    stdout = io.StringIO()
+    stdin = sys.stdin
+    # Simula 10 enters para las opciones
+    sys.stdin = io.StringIO("\n" * 10)
     try:
-        result = subprocess.run(
-            ['python', script_file],
-            capture_output=True,
-            text=True,
-            timeout=5,
-            input="\n" * 10  # Simula 10 enters para las opciones
-        )
-        return True, result.stdout
-    except subprocess.TimeoutExpired:
+        code = compile(Path(script_file).read_text(encoding='utf-8'), script_file, 'exec')
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()), time_limit(5):
+            exec(code, {"__name__": "__main__", "__file__": script_file})
+    except TimeoutError:
         return False, "Timeout en ejecución"
-    except Exception as e:
-        return False, str(e)
+    except (Exception, SystemExit):
+        # Igual que con un proceso aparte: terminar con error (por ejemplo
+        # EOFError al acabarse los enters) no cuenta como fallo
+        pass
+    finally:
+        sys.stdin = stdin
+    return True, stdout.getvalue()
+
+
+def run_case(case):
+    """
+    Una prueba: compila y, si execute es verdadero y compiló, ejecuta el
+    script generado. Se ejecuta en un proceso del pool.
+    """
+    input_file, output_file, execute = case
+    success, stdout, stderr = run_compiler(input_file, output_file)
+    exec_result = run_generated_script(output_file) if execute and success else None
+    return success, stdout, stderr, exec_result
 
 
-def run_valid_tests():
+def run_cases(cases, pool=None):
+    """Ejecuta las pruebas (en el pool si hay uno) y retorna los resultados en orden"""
+    if pool is None:
+        return [run_case(case) for case in cases]
+    return list(pool.map(run_case, cases))
+
+
+def run_valid_tests(pool=None):
     """Ejecuta todos los tests que deben compilar correctamente"""
     print_header("PRUEBAS VÁLIDAS (Deben compilar y ejecutar)")
     
@@ -80,16 +141,15 @@ def run_valid_tests():
     passed = 0
     failed = 0
     
-    for test_file in valid_tests:
+    # Intenta compilar cada archivo y, si compiló, ejecutar el script generado
+    cases = [(str(f), str(output_dir / f"{f.stem}.py"), True) for f in valid_tests]
+    results = run_cases(cases, pool)
+    
+    for test_file, (success, stdout, stderr, exec_result) in zip(valid_tests, results):
         test_name = test_file.stem  # Nombre sin extensión
-        output_file = output_dir / f"{test_name}.py"
-        
-        # Intenta compilar el archivo
-        success, stdout, stderr = run_compiler(str(test_file), str(output_file))
         
         if success:
-            # Si compiló, intenta ejecutar el script generado
-            exec_success, exec_output = run_generated_script(str(output_file))
+            exec_success, exec_output = exec_result
             if exec_success:
                 print_test(test_name, True, "Compilado y ejecutado correctamente")
                 passed += 1
@@ -107,7 +167,7 @@ def run_valid_tests():
     return passed, failed
 
 
-def run_error_tests():
+def run_error_tests(pool=None):
     """Ejecuta tests que DEBEN fallar (tienen errores a propósito)"""
     print_header("PRUEBAS CON ERRORES (Deben detectar errores)")
     
@@ -119,12 +179,12 @@ def run_error_tests():
     passed = 0
     failed = 0
     
-    for test_file in error_tests:
+    # Compila cada archivo (esperamos que falle)
+    cases = [(str(f), str(Path('output') / f"{f.stem}_should_fail.py"), False) for f in error_tests]
+    results = run_cases(cases, pool)
+    
+    for test_file, (success, stdout, stderr, _) in zip(error_tests, results):
         test_name = test_file.stem
-        output_file = Path('output') / f"{test_name}_should_fail.py"
-        
-        # Compila (esperamos que falle)
-        success, stdout, stderr = run_compiler(str(test_file), str(output_file))
         
         if not success:
             # Bien! El compilador detectó el error
@@ -154,9 +214,18 @@ def run_error_tests():
     return passed, failed
 
 
-def generate_test_report():
+def generate_test_report(pool=None):
     """Genera un reporte en Markdown con los resultados"""
     report_file = Path('REPORTE_PRUEBAS.md')
+    tests_dir = Path('tests')
+    
+    # Todas las compilaciones del reporte de una vez, para repartirlas en el pool
+    valid_tests = sorted(tests_dir.glob('test*.txt'))
+    error_tests = sorted(tests_dir.glob('error*.txt'))
+    cases = [(str(f), str(Path('output') / f"{f.stem}.py"), False) for f in valid_tests]
+    cases += [(str(f), str(Path('output') / f"{f.stem}_fail.py"), False) for f in error_tests]
+    results = run_cases(cases, pool)
+    valid_results, error_results = results[:len(valid_tests)], results[len(valid_tests):]
     
     with open(report_file, 'w', encoding='utf-8') as f:
         f.write("# Reporte de Pruebas - Compilador ScriptLang\n\n")
@@ -167,13 +236,9 @@ def generate_test_report():
         f.write("| Test | Descripción | Estado |\n")
         f.write("|------|-------------|--------|\n")
         
-        tests_dir = Path('tests')
-        for test_file in sorted(tests_dir.glob('test*.txt')):
+        for test_file, (success, _, _, _) in zip(valid_tests, valid_results):
             content = test_file.read_text(encoding='utf-8')
             desc = content.split('\n')[0][:50]  # Primera línea como descripción
-            output_file = Path('output') / f"{test_file.stem}.py"
-            
-            success, _, _ = run_compiler(str(test_file), str(output_file))
             status = "✅ Pasó" if success else "❌ Falló"
             
             f.write(f"| {test_file.stem} | {desc} | {status} |\n")
@@ -183,10 +248,7 @@ def generate_test_report():
         f.write("| Test | Tipo de Error | Estado |\n")
         f.write("|------|---------------|--------|\n")
         
-        for test_file in sorted(tests_dir.glob('error*.txt')):
-            output_file = Path('output') / f"{test_file.stem}_fail.py"
-            success, stdout, _ = run_compiler(str(test_file), str(output_file))
-            
+        for test_file, (success, stdout, _, _) in zip(error_tests, error_results):
             error_type = "Semántico" if "semántico" in stdout.lower() else "Sintáctico/Léxico"
             status = "✅ Detectado" if not success else "❌ No detectado"
             
@@ -197,7 +259,7 @@ def generate_test_report():
     print(f"\n{Colors.GREEN}Reporte generado: {report_file}{Colors.RESET}")
 
 
-def main():
+def main(jobs=None):
     """Función principal que ejecuta todas las pruebas"""
     print_header("SISTEMA DE PRUEBAS AUTOMATIZADO - COMPILADOR SCRIPTLANG")
     
@@ -210,27 +272,39 @@ def main():
         print(f"{Colors.RED}Error: carpeta tests/ no encontrada{Colors.RESET}")
         sys.exit(1)
     
-    # Ejecutar las dos categorías de pruebas
-    valid_passed, valid_failed = run_valid_tests()
-    error_passed, error_failed = run_error_tests()
+    # Con -j 1 todo corre en este proceso; si no, en un pool de procesos
+    # que ya tienen el compilador importado
+    jobs = jobs or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
     
-    # Mostrar resumen final
-    print_header("RESUMEN FINAL")
-    total_passed = valid_passed + error_passed
-    total_failed = valid_failed + error_failed
-    total = total_passed + total_failed
-    
-    print(f"Total de pruebas: {total}")
-    print(f"{Colors.GREEN}Exitosas: {total_passed}{Colors.RESET}")
-    print(f"{Colors.RED}Fallidas: {total_failed}{Colors.RESET}")
-    print(f"Porcentaje de éxito: {(total_passed/total*100):.1f}%\n")
-    
-    # Generar el reporte markdown
-    generate_test_report()
+    try:
+        # Ejecutar las dos categorías de pruebas
+        valid_passed, valid_failed = run_valid_tests(pool)
+        error_passed, error_failed = run_error_tests(pool)
+        
+        # Mostrar resumen final
+        print_header("RESUMEN FINAL")
+        total_passed = valid_passed + error_passed
+        total_failed = valid_failed + error_failed
+        total = total_passed + total_failed
+        
+        print(f"Total de pruebas: {total}")
+        print(f"{Colors.GREEN}Exitosas: {total_passed}{Colors.RESET}")
+        print(f"{Colors.RED}Fallidas: {total_failed}{Colors.RESET}")
+        print(f"Porcentaje de éxito: {(total_passed/total*100):.1f}%\n")
+        
+        # Generar el reporte markdown
+        generate_test_report(pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
     
     return 0 if total_failed == 0 else 1
 
 
 # Punto de entrada
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser(description="Pruebas del compilador ScriptLang")
+    arg_parser.add_argument("-j", "--jobs", type=int,
+                            help="procesos en paralelo (por defecto, uno por CPU)")
+    sys.exit(main(arg_parser.parse_args().jobs))
\ No newline at end of file
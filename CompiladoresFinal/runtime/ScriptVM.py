@@ -0,0 +1,133 @@
+import sys
+from typing import List, Optional
+from code_generator.CompactIR import CompactIR, Opcode, NO_TARGET
+
+PRINT = Opcode.PRINT
+
+
+class ConsoleIO:
+    """Entrada/salida por consola, igual que el script generado"""
+    def write(self, text: str):
+        sys.stdout.write(text)
+    
+    def read(self, prompt: str) -> Optional[str]:
+        try:
+            return input(prompt)
+        except EOFError:
+            return None
+
+
+class ScriptedIO:
+    """
+    Entrada/salida en memoria: responde con las entradas dadas, en orden,
+    y acumula todo lo escrito (incluidos los prompts) en output. Sin echo
+    la salida es la misma que la de un script con la entrada redirigida.
+    """
+    def __init__(self, inputs, echo: bool = False):
+        self.inputs = iter(inputs)
+        self.echo = echo
+        self.chunks: List[str] = []
+    
+    def write(self, text: str):
+        self.chunks.append(text)
+    
+    def read(self, prompt: str) -> Optional[str]:
+        self.chunks.append(prompt)
+        answer = next(self.inputs, None)
+        if answer is not None and self.echo:
+            self.chunks.append(answer + "\n")
+        return answer
+    
+    @property
+    def output(self) -> str:
+        return "".join(self.chunks)
+
+
+class Session:
+    """
+    Estado de una ejecución: escena actual, posición de la siguiente
+    instrucción (índice absoluto en los arreglos de la CompactIR) y, en el
+    modo por llamadas, la pila de retorno. Es todo lo que hay que guardar
+    por jugador, así que un servidor puede mantener miles a la vez.
+    """
+    __slots__ = ("scene", "ip", "stack", "finished")
+    
+    def __init__(self, scene: int, ip: int):
+        self.scene = scene
+        self.ip = ip
+        self.stack = []
+        self.finished = scene == NO_TARGET
+
+
+class ScriptVM:
+    """
+    Ejecuta la IR directamente, sin generar ni importar código Python.
+    
+    Por defecto reproduce el programa de PythonCodeGenerator: elegir una
+    opción "llama" a la escena destino y, cuando esta termina, la escena
+    anterior continúa (con una pila explícita, no la de Python). Con
+    dispatch=True se comporta como DispatchCodeGenerator: ir_a es un
+    salto y la memoria por sesión es constante.
+    
+    La VM no guarda estado de ninguna sesión; el mismo programa puede
+    atender muchas sesiones con resume()/choose(), o una sola con run().
+    """
+    def __init__(self, program: CompactIR, dispatch: bool = False):
+        self.program = program
+        self.dispatch = dispatch
+    
+    def new_session(self) -> Session:
+        scene = self.program.first_scene
+        ip = self.program.scene_start[scene] if scene != NO_TARGET else 0
+        return Session(scene, ip)
+    
+    def resume(self, session: Session, write) -> Optional[str]:
+        """
+        Ejecuta desde la posición de la sesión escribiendo cada PRINT con
+        write(). Se detiene en la siguiente opción y retorna su prompt, o
+        retorna None si la historia terminó.
+        """
+        program = self.program
+        ops, texts, scene_start, string = program.ops, program.texts, program.scene_start, program.string
+        while not session.finished:
+            ip = session.ip
+            end = scene_start[session.scene + 1]
+            while ip < end and ops[ip] == PRINT:
+                write(string(texts[ip]) + "\n")
+                ip += 1
+            session.ip = ip
+            if ip < end:
+                return string(texts[ip]) + " -> "
+            # Fin de la escena: volver a quien la llamó o terminar
+            if session.stack:
+                session.scene, session.ip = session.stack.pop()
+            else:
+                session.finished = True
+        return None
+    
+    def choose(self, session: Session, answer: str):
+        """Aplica la respuesta a la opción pendiente (vacía = no elegirla)"""
+        ip = session.ip
+        if not answer.strip():
+            session.ip = ip + 1
+            return
+        target = self.program.targets[ip]
+        if not self.dispatch:
+            session.stack.append((session.scene, ip + 1))
+        session.scene = target
+        session.ip = self.program.scene_start[target]
+    
+    def run(self, io=None) -> Session:
+        """Ejecuta una sesión completa con io (por defecto la consola)"""
+        io = io or ConsoleIO()
+        session = self.new_session()
+        while True:
+            prompt = self.resume(session, io.write)
+            if prompt is None:
+                break
+            answer = io.read(prompt)
+            if answer is None:  # Sin más entrada
+                session.finished = True
+                break
+            self.choose(session, answer)
+        return session
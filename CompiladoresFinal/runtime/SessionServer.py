@@ -0,0 +1,143 @@
+import asyncio
+import itertools
+import os
+import stat
+import sys
+from typing import Dict, Optional, Tuple
+from code_generator.CompactIR import CompactIR
+from .ScriptVM import ScriptVM, Session
+
+# Marca que se envía cuando una historia termina
+END_MARK = "[fin]"
+
+
+def is_pipe(stream) -> bool:
+    """Si stream es un pipe o un socket, lo único que acepta connect_read_pipe"""
+    try:
+        mode = os.fstat(stream.fileno()).st_mode
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+
+class SessionManager:
+    """
+    Muchas sesiones de una misma historia en un solo proceso. Cada sesión
+    es solo un Session de ScriptVM (escena, instrucción y, en modo por
+    llamadas, su pila), así que no hay hilos ni corutinas por jugador.
+    open() y send() retornan el texto que hay que mostrar al jugador.
+    """
+    def __init__(self, program: CompactIR, dispatch: bool = True):
+        self.vm = ScriptVM(program, dispatch=dispatch)
+        self.sessions: Dict[str, Session] = {}
+        self._ids = itertools.count(1)
+    
+    def open(self, session_id: Optional[str] = None) -> Tuple[str, str, bool]:
+        """Crea una sesión y retorna (id, salida, terminada)"""
+        if session_id is None:
+            session_id = str(next(self._ids))
+        session = self.vm.new_session()
+        self.sessions[session_id] = session
+        output, finished = self._advance(session_id, session)
+        return session_id, output, finished
+    
+    def send(self, session_id: str, answer: str) -> Tuple[str, bool]:
+        """Responde la opción pendiente y retorna (salida, terminada)"""
+        session = self.sessions[session_id]
+        self.vm.choose(session, answer)
+        return self._advance(session_id, session)
+    
+    def close(self, session_id: str):
+        self.sessions.pop(session_id, None)
+    
+    def _advance(self, session_id: str, session: Session) -> Tuple[str, bool]:
+        chunks = []
+        prompt = self.vm.resume(session, chunks.append)
+        if prompt is None:
+            self.close(session_id)
+            return "".join(chunks), True
+        chunks.append(prompt)
+        return "".join(chunks), False
+    
+    def __len__(self):
+        return len(self.sessions)
+
+
+class SessionServer:
+    """
+    Front end asyncio de SessionManager con dos transportes:
+    
+    - TCP (serve_tcp): cada conexión es una sesión; el servidor escribe
+      la salida y espera una línea por cada opción, como el script
+      generado en una terminal.
+    - stdio (serve_stdio): un solo flujo multiplexado. Cada línea de
+      entrada es "<id> <respuesta>"; un id nuevo abre una sesión. Cada
+      línea de salida es "<id>: <texto>" y, al terminar, "<id>: [fin]".
+    """
+    def __init__(self, program: CompactIR, dispatch: bool = True):
+        self.manager = SessionManager(program, dispatch=dispatch)
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session_id, output, finished = self.manager.open()
+        try:
+            while True:
+                writer.write(output.encode("utf-8"))
+                if finished:
+                    writer.write(f"{END_MARK}\n".encode("utf-8"))
+                    await writer.drain()
+                    break
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                output, finished = self.manager.send(session_id, line.decode("utf-8").rstrip("\r\n"))
+        except ConnectionError:
+            pass
+        finally:
+            self.manager.close(session_id)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+    
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 7000):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        address = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Sirviendo historias en {address}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+    
+    def handle_line(self, line: str):
+        """Procesa una línea del protocolo stdio y retorna las líneas de respuesta"""
+        session_id, _, answer = line.rstrip("\r\n").partition(" ")
+        if not session_id:
+            return []
+        if session_id in self.manager.sessions:
+            output, finished = self.manager.send(session_id, answer)
+        else:
+            _, output, finished = self.manager.open(session_id)
+        lines = [f"{session_id}: {text}" for text in output.splitlines()]
+        if finished:
+            lines.append(f"{session_id}: {END_MARK}")
+        return lines
+    
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        if is_pipe(sys.stdin):
+            reader = asyncio.StreamReader()
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+            readline = reader.readline
+        else:
+            # Un archivo redirigido (< respuestas.txt) o una terminal: se
+            # lee línea por línea en un hilo
+            async def readline():
+                return await loop.run_in_executor(None, sys.stdin.buffer.readline)
+        while True:
+            line = await readline()
+            if not line:
+                break
+            lines = self.handle_line(line.decode("utf-8"))
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
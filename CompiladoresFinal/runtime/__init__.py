@@ -0,0 +1,9 @@
+from lazy_exports import lazy_exports
+
+from .ScriptVM import ScriptVM, Session, ConsoleIO, ScriptedIO
+
+# El servidor importa asyncio, que solo hace falta con --serve
+lazy_exports(__name__, {
+    "SessionServer": ".SessionServer",
+    "SessionManager": ".SessionServer",
+})
@@ -0,0 +1,81 @@
+from typing import Dict, List
+from antlr4.tree.Tree import ErrorNode, TerminalNode
+from generated.ScriptLangVisitor import ScriptLangVisitor
+from generated.ScriptLangParser import ScriptLangParser
+from code_generator.IRInstruction import IRInstruction
+from .SemanticVisitor import SemanticVisitor
+
+ID = ScriptLangParser.ID
+STRING = ScriptLangParser.STRING
+SceneContext = ScriptLangParser.SceneContext
+DialogueContext = ScriptLangParser.DialogueContext
+SayStmtContext = ScriptLangParser.SayStmtContext
+OptionStmtContext = ScriptLangParser.OptionStmtContext
+
+
+class FusedVisitor(ScriptLangVisitor):
+    """
+    Fases 3 y 4 en un solo recorrido del árbol: declara cada escena en la
+    tabla de símbolos, anota sus referencias ir_a y emite sus instrucciones
+    IR a la vez. Produce los mismos errores que SemanticVisitor y la misma
+    IR que IRGenerator.
+    
+    Recorre ctx.children directamente en lugar de usar los accesores
+    generados (ctx.scene(), ctx.dialogue(), ctx.ID()...), que crean una
+    lista nueva o buscan entre los hijos en cada llamada.
+    """
+    def __init__(self):
+        super().__init__()
+        self.semantic = SemanticVisitor()
+        self.scenes: Dict[str, List[IRInstruction]] = {}
+        self.first_scene = None
+    
+    @property
+    def errors(self):
+        return self.semantic.errors
+    
+    def visitProgram(self, ctx: ScriptLangParser.ProgramContext):
+        for child in ctx.children or ():
+            if isinstance(child, SceneContext):
+                self.visitScene(child)
+        self.semantic.check_references()
+        return None
+    
+    def visitScene(self, ctx: ScriptLangParser.SceneContext):
+        scene_name = None
+        instructions = []
+        references = self.semantic.scene_references
+        for child in ctx.children or ():
+            if isinstance(child, DialogueContext):
+                if not child.children:
+                    continue
+                stmt = child.children[0]
+                if not isinstance(stmt, (SayStmtContext, OptionStmtContext)):
+                    continue
+                text = target = None
+                for node in stmt.children or ():
+                    if isinstance(node, TerminalNode) and not isinstance(node, ErrorNode):
+                        token_type = node.symbol.type
+                        if token_type == STRING:
+                            text = node.symbol.text[1:-1]
+                        elif token_type == ID:
+                            target = node.symbol
+                if isinstance(stmt, SayStmtContext):
+                    if text is not None:
+                        instructions.append(IRInstruction("PRINT", text))
+                elif target is not None:
+                    references.append((scene_name, target.line, target.column, target.text))
+                    if text is not None:
+                        instructions.append(IRInstruction("OPTION", text, target.text))
+            elif (scene_name is None and isinstance(child, TerminalNode)
+                  and not isinstance(child, ErrorNode) and child.symbol.type == ID):
+                token = child.symbol
+                scene_name = token.text
+                self.semantic.declare_scene(scene_name, token.line, token.column)
+                self.scenes[scene_name] = instructions
+                if self.first_scene is None:
+                    self.first_scene = scene_name
+        return None
+    
+    def get_ir(self):
+        return {"scenes": self.scenes, "first_scene": self.first_scene}
@@ -0,0 +1,132 @@
+import string
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional
+
+# Caracteres de un ID (ver ScriptLang.g4)
+ID_CHARS = string.ascii_letters + string.digits + "_"
+
+# Distancia máxima de una sugerencia
+MAX_DISTANCE = 2
+
+
+def edits1(name: str):
+    """Nombres a un cambio de name: borrar, cambiar o insertar una letra, o cambiar dos vecinas de lugar"""
+    splits = [(name[:i], name[i:]) for i in range(len(name) + 1)]
+    for left, right in splits:
+        if right:
+            yield left + right[1:]
+            if len(right) > 1:
+                yield left + right[1] + right[0] + right[2:]
+            for c in ID_CHARS:
+                yield left + c + right[1:]
+        for c in ID_CHARS:
+            yield left + c + right
+
+
+def next_row(name: str, row: List[int], previous: Optional[List[int]], prefix: str) -> List[int]:
+    """
+    Fila de la matriz de distancias de prefix contra los prefijos de name,
+    a partir de la fila de prefix[:-1] (row) y la de prefix[:-2]
+    (previous). El cambio de dos letras vecinas cuenta como uno (Damerau
+    restringida).
+    """
+    c = prefix[-1]
+    before = prefix[-2] if len(prefix) > 1 else None
+    current = [row[0] + 1]
+    for j in range(1, len(name) + 1):
+        value = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + (c != name[j - 1]))
+        if j > 1 and c == name[j - 2] and before == name[j - 1]:
+            value = min(value, previous[j - 2] + 1)
+        current.append(value)
+    return current
+
+
+class NameIndex:
+    """
+    Índice para sugerir el nombre más parecido a uno que no existe
+    (closest). Los nombres a un cambio se buscan generando todas sus
+    variantes y consultándolas en el conjunto de nombres, sin recorrerlo.
+    Los que están a dos cambios se buscan recorriendo la lista ordenada de
+    nombres como un árbol de prefijos (cada prefijo es un tramo de la
+    lista): los nombres que comparten un prefijo se comparan una sola vez
+    hasta ahí, y se deja de bajar por un prefijo que ya está a más de dos
+    cambios de todo prefijo del buscado. El recorrido va en orden
+    alfabético, así que termina con el primer nombre que está cerca. La
+    lista ordenada solo se arma cuando hace falta.
+    
+    Los nombres de menos de 6 letras solo tienen sugerencias a un cambio.
+    Entre varias a la misma distancia gana la primera en orden alfabético,
+    así el resultado no depende del orden en que se agregaron los nombres.
+    """
+    def __init__(self, names: Iterable[str] = ()):
+        self.names = set(names)
+        self.sorted_names: Optional[List[str]] = None
+        self.cache: Dict[str, Optional[str]] = {}
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def add(self, name: str):
+        if name in self.names:
+            return
+        self.names.add(name)
+        self.cache.clear()
+        if self.sorted_names is not None:
+            insort(self.sorted_names, name)
+    
+    def discard(self, name: str):
+        if name not in self.names:
+            return
+        self.names.discard(name)
+        self.cache.clear()
+        if self.sorted_names is not None:
+            del self.sorted_names[bisect_left(self.sorted_names, name)]
+    
+    def closest(self, name: str) -> Optional[str]:
+        """El nombre del índice más parecido a name, o None si no hay uno cerca"""
+        if name not in self.cache:
+            self.cache[name] = self.find_closest(name)
+        return self.cache[name]
+    
+    def find_closest(self, name: str) -> Optional[str]:
+        names = self.names
+        near = [candidate for candidate in edits1(name) if candidate in names and candidate != name]
+        if near:
+            return min(near)
+        if min(MAX_DISTANCE, len(name) // 3) < 2:
+            return None
+        if self.sorted_names is None:
+            self.sorted_names = sorted(names)
+        return self.first_within(name, MAX_DISTANCE)
+    
+    def first_within(self, name: str, limit: int) -> Optional[str]:
+        """El primer nombre en orden alfabético a limit cambios o menos de name (sin contar name)"""
+        ordered = self.sorted_names
+        # Pendientes: (prefijo, tramo de la lista con ese prefijo, fila del padre y del abuelo)
+        pending = [("", 0, len(ordered), None, None)]
+        while pending:
+            prefix, lo, hi, row, previous = pending.pop()
+            if row is None:
+                current = list(range(len(name) + 1))
+            else:
+                current = next_row(name, row, previous, prefix)
+                if min(current) > limit:
+                    continue
+            depth = len(prefix)
+            if lo < hi and ordered[lo] == prefix:
+                # El prefijo es un nombre (el primero de su tramo)
+                if current[-1] <= limit and prefix != name:
+                    return prefix
+                lo += 1
+            children = []
+            while lo < hi:
+                child = prefix + ordered[lo][depth]
+                end = bisect_left(ordered, child[:-1] + chr(ord(child[-1]) + 1), lo, hi)
+                children.append((child, lo, end, current, row))
+                lo = end
+            # Al revés, para sacar primero el menor
+            pending.extend(reversed(children))
+        return None
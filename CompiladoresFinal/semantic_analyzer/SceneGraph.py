@@ -0,0 +1,189 @@
+from array import array
+from typing import Dict, List, Any
+from code_generator.CompactIR import CompactIR, Opcode, NO_TARGET
+
+
+class SceneGraph:
+    """
+    Grafo de escenas indexado en forma CSR: los sucesores (sin repetir) de
+    la escena i son edges[edge_start[i]:edge_start[i + 1]]. Se construye
+    una vez desde la CompactIR y todos los análisis son iterativos y
+    O(escenas + opciones), así que sirven para millones de escenas sin
+    tocar el límite de recursión.
+    """
+    def __init__(self, scene_names: List[str], edge_start: array, edges: array,
+                 first_scene: int = NO_TARGET):
+        self.scene_names = scene_names
+        self.edge_start = edge_start
+        self.edges = edges
+        self.first_scene = first_scene
+    
+    @classmethod
+    def from_compact(cls, compact: CompactIR) -> "SceneGraph":
+        ops, targets, scene_start = compact.ops, compact.targets, compact.scene_start
+        edge_start = array('I', [0])
+        edges = array('I')
+        option = Opcode.OPTION
+        for scene_id in range(compact.scene_count):
+            seen = set()
+            for i in range(scene_start[scene_id], scene_start[scene_id + 1]):
+                if ops[i] == option:
+                    target = targets[i]
+                    if target not in seen:
+                        seen.add(target)
+                        edges.append(target)
+            edge_start.append(len(edges))
+        return cls(compact.scene_names, edge_start, edges, compact.first_scene)
+    
+    @classmethod
+    def from_ir(cls, ir: Dict[str, Any]) -> "SceneGraph":
+        return cls.from_compact(CompactIR.from_ir(ir))
+    
+    @property
+    def scene_count(self) -> int:
+        return len(self.edge_start) - 1
+    
+    @property
+    def edge_count(self) -> int:
+        return len(self.edges)
+    
+    def successors(self, scene_id: int):
+        return self.edges[self.edge_start[scene_id]:self.edge_start[scene_id + 1]]
+    
+    def reversed(self) -> "SceneGraph":
+        """Grafo con las aristas invertidas (predecesores de cada escena)"""
+        n = self.scene_count
+        counts = array('I', [0]) * (n + 1)
+        for target in self.edges:
+            counts[target + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        edge_start = array('I', counts)
+        edges = array('I', [0]) * len(self.edges)
+        for scene_id in range(n):
+            for i in range(self.edge_start[scene_id], self.edge_start[scene_id + 1]):
+                target = self.edges[i]
+                edges[counts[target]] = scene_id
+                counts[target] += 1
+        return SceneGraph(self.scene_names, edge_start, edges, self.first_scene)
+    
+    def reachable_from(self, roots) -> bytearray:
+        """Marca (1) cada escena alcanzable desde alguna de las raíces"""
+        edge_start, edges = self.edge_start, self.edges
+        seen = bytearray(self.scene_count)
+        stack = [root for root in roots if root != NO_TARGET]
+        for root in stack:
+            seen[root] = 1
+        while stack:
+            scene_id = stack.pop()
+            for i in range(edge_start[scene_id], edge_start[scene_id + 1]):
+                target = edges[i]
+                if not seen[target]:
+                    seen[target] = 1
+                    stack.append(target)
+        return seen
+    
+    def reachable(self) -> bytearray:
+        return self.reachable_from((self.first_scene,))
+    
+    def unreachable_scenes(self) -> List[int]:
+        """Escenas que ningún camino desde la primera escena visita"""
+        seen = self.reachable()
+        return [i for i in range(self.scene_count) if not seen[i]]
+    
+    def dead_ends(self) -> List[int]:
+        """Escenas sin opciones: la historia siempre termina al llegar a ellas"""
+        edge_start = self.edge_start
+        return [i for i in range(self.scene_count) if edge_start[i] == edge_start[i + 1]]
+    
+    def strongly_connected_components(self) -> List[List[int]]:
+        """Componentes fuertemente conexas (Tarjan iterativo)"""
+        n = self.scene_count
+        edge_start, edges = self.edge_start, self.edges
+        index = array('i', [-1]) * n
+        low = array('I', [0]) * n
+        on_stack = bytearray(n)
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            # Pila de llamadas explícita: (escena, próxima arista a visitar)
+            calls = [[root, edge_start[root]]]
+            while calls:
+                frame = calls[-1]
+                scene_id, i = frame
+                if i < edge_start[scene_id + 1]:
+                    frame[1] = i + 1
+                    target = edges[i]
+                    if index[target] == -1:
+                        index[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        calls.append([target, edge_start[target]])
+                    elif on_stack[target] and index[target] < low[scene_id]:
+                        low[scene_id] = index[target]
+                    continue
+                calls.pop()
+                if calls:
+                    parent = calls[-1][0]
+                    if low[scene_id] < low[parent]:
+                        low[parent] = low[scene_id]
+                if low[scene_id] == index[scene_id]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == scene_id:
+                            break
+                    components.append(component)
+        return components
+    
+    def cycles(self) -> List[List[int]]:
+        """Componentes con un ciclo: más de una escena o una escena que vuelve a sí misma"""
+        return [
+            component for component in self.strongly_connected_components()
+            if len(component) > 1 or component[0] in self.successors(component[0])
+        ]
+    
+    def report(self) -> Dict[str, Any]:
+        names = self.scene_names
+        return {
+            "scenes": self.scene_count,
+            "edges": self.edge_count,
+            "first_scene": names[self.first_scene] if self.first_scene != NO_TARGET else None,
+            "unreachable": [names[i] for i in self.unreachable_scenes()],
+            "dead_ends": [names[i] for i in self.dead_ends()],
+            "cycles": [sorted(names[i] for i in component) for component in self.cycles()],
+        }
+
+
+def format_graph_report(report: Dict[str, Any], limit: int = 20) -> str:
+    """Reporte legible del grafo de escenas; cada lista muestra hasta limit nombres"""
+    def names(items):
+        if not items:
+            return "-"
+        shown = ", ".join(items[:limit])
+        if len(items) > limit:
+            shown += f", ... (+{len(items) - limit})"
+        return shown
+    
+    lines = [
+        f"Escenas: {report['scenes']}  Opciones distintas: {report['edges']}  "
+        f"Inicio: {report['first_scene']}",
+        f"Inalcanzables ({len(report['unreachable'])}): {names(report['unreachable'])}",
+        f"Finales sin opciones ({len(report['dead_ends'])}): {names(report['dead_ends'])}",
+        f"Ciclos ({len(report['cycles'])}):",
+    ]
+    for component in report["cycles"][:limit]:
+        lines.append(f"  - {len(component)} escenas: {names(component)}")
+    if len(report["cycles"]) > limit:
+        lines.append(f"  ... (+{len(report['cycles']) - limit})")
+    return "\n".join(lines)
@@ -0,0 +1,40 @@
+from typing import Optional
+from diagnostics.Diagnostic import Diagnostic, DUPLICATE_SCENE, UNKNOWN_SCENE
+from .SymbolTable import SymbolTable
+
+class SemanticChecker:
+    """
+    Reglas semánticas sin depender del árbol de ANTLR: escenas duplicadas
+    y referencias ir_a a escenas que no existen. SemanticVisitor las
+    aplica recorriendo el árbol; el frontend rápido y el modo streaming
+    las usan directamente, sin importar ANTLR.
+    
+    Las escenas se declaran con la posición de su nombre y las
+    referencias (escena, línea, columna, destino) con la del destino;
+    cada error es un Diagnostic que señala ese nombre. Una referencia a
+    una escena que no existe sugiere la declarada más parecida (ver
+    NameIndex), si hay una a uno o dos cambios.
+    """
+    def __init__(self):
+        super().__init__()
+        self.table = SymbolTable()
+        self.errors = []
+        self.scene_references = []
+    
+    def error_at(self, code: str, line: int, column: int, name: str, message: str):
+        self.errors.append(Diagnostic.spanning(code, message, line, column, name))
+    
+    def declare_scene(self, scene_name: str, line: int, column: int):
+        if not self.table.add_scene(scene_name):
+            self.error_at(DUPLICATE_SCENE, line, column, scene_name,
+                          f"Escena '{scene_name}' duplicada")
+    
+    def unknown_scene(self, line: int, column: int, ref_scene: str, suggestion: Optional[str] = None):
+        hint = f" (¿quisiste decir '{suggestion}'?)" if suggestion else ""
+        self.error_at(UNKNOWN_SCENE, line, column, ref_scene,
+                      f"Escena '{ref_scene}' no existe{hint}")
+    
+    def check_references(self):
+        for scene_name, line, column, ref_scene in self.scene_references:
+            if not self.table.scene_exists(ref_scene):
+                self.unknown_scene(line, column, ref_scene, self.table.closest_scene(ref_scene))
@@ -1,38 +1,52 @@
+from antlr4.tree.Tree import ErrorNode
 from generated.ScriptLangVisitor import ScriptLangVisitor
 from generated.ScriptLangParser import ScriptLangParser
-from .SymbolTable import SymbolTable
+from .SemanticChecker import SemanticChecker
 
-class SemanticVisitor(ScriptLangVisitor):
-    def __init__(self):
-        super().__init__()
-        self.table = SymbolTable()
-        self.errors = []
-        self.scene_references = []
-    
-    def error(self, ctx, message: str):
-        line = getattr(ctx.start, "line", "?")
-        self.errors.append(f"[Línea {line}] Error: {message}")
-    
+
+def name_token(ctx, token_type: int):
+    """
+    Token token_type de ctx, o None si falta: en un árbol recuperado de
+    errores de sintaxis el token puede no estar, o ANTLR pudo agregar
+    antes uno de error (sobrante o supuesto, "<missing ID>")
+    """
+    for node in ctx.getTokens(token_type):
+        if not isinstance(node, ErrorNode):
+            return node.symbol
+    return None
+
+
+def token_text(ctx, token_type: int):
+    """Texto de name_token(ctx, token_type), o None si falta"""
+    token = name_token(ctx, token_type)
+    return token.text if token is not None else None
+
+
+class SemanticVisitor(SemanticChecker, ScriptLangVisitor):
+    """
+    Aplica las reglas de SemanticChecker recorriendo el árbol de ANTLR,
+    también uno recuperado de errores de sintaxis: las escenas sin nombre
+    no se declaran y las opciones sin destino no se revisan.
+    """
     def visitProgram(self, ctx: ScriptLangParser.ProgramContext):
         for scene_ctx in ctx.scene():
-            scene_name = scene_ctx.ID().getText()
-            if not self.table.add_scene(scene_name):
-                self.error(scene_ctx, f"Escena '{scene_name}' duplicada")
+            token = name_token(scene_ctx, ScriptLangParser.ID)
+            if token is not None:
+                self.declare_scene(token.text, token.line, token.column)
         
         for scene_ctx in ctx.scene():
             self.visitScene(scene_ctx)
         
-        for scene_name, line, ref_scene in self.scene_references:
-            if not self.table.scene_exists(ref_scene):
-                self.errors.append(f"[Línea {line}] Error: Escena '{ref_scene}' no existe")
+        self.check_references()
         return None
     
     def visitScene(self, ctx: ScriptLangParser.SceneContext):
-        scene_name = ctx.ID().getText()
+        scene_name = token_text(ctx, ScriptLangParser.ID)
         for dialogue_ctx in ctx.dialogue():
             if dialogue_ctx.optionStmt():
                 option_ctx = dialogue_ctx.optionStmt()
-                target = option_ctx.ID().getText()
-                line = option_ctx.start.line
-                self.scene_references.append((scene_name, line, target))
+                target = name_token(option_ctx, ScriptLangParser.ID)
+                if target is None:
+                    continue
+                self.scene_references.append((scene_name, target.line, target.column, target.text))
         return None
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional
+from .NameIndex import NameIndex
 
 @dataclass
 class Symbol:
@@ -9,12 +10,22 @@ class Symbol:
 class SymbolTable:
     def __init__(self):
         self.scenes: Dict[str, Symbol] = {}
+        # Se arma al buscar la primera sugerencia (closest_scene)
+        self.scene_index: Optional[NameIndex] = None
     
     def add_scene(self, name: str) -> bool:
         if name in self.scenes:
             return False
         self.scenes[name] = Symbol(name, 'scene')
+        if self.scene_index is not None:
+            self.scene_index.add(name)
         return True
     
     def scene_exists(self, name: str) -> bool:
         return name in self.scenes
+    
+    def closest_scene(self, name: str) -> Optional[str]:
+        """La escena declarada más parecida a name, para sugerirla"""
+        if self.scene_index is None:
+            self.scene_index = NameIndex(self.scenes)
+        return self.scene_index.closest(name)
@@ -1,2 +1,12 @@
+from lazy_exports import lazy_exports
+
+from .NameIndex import NameIndex
 from .SymbolTable import SymbolTable
-from .SemanticVisitor import SemanticVisitor
+from .SemanticChecker import SemanticChecker
+from .SceneGraph import SceneGraph, format_graph_report
+
+# Los visitantes recorren el árbol de ANTLR y se importan al pedirlos
+lazy_exports(__name__, {
+    "SemanticVisitor": ".SemanticVisitor",
+    "FusedVisitor": ".FusedVisitor",
+})